@@ -0,0 +1,115 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from sklearn.preprocessing import StandardScaler
+
+from limpeza import clean_series
+
+PARTITION_COLUMN = 'created_month'
+BATCH_SIZE = 1_000_000
+
+SCHEMA = pa.schema([
+    ('id', pa.string()),
+    ('title', pa.string()),
+    ('author', pa.dictionary(pa.int32(), pa.string())),
+    ('score', pa.int32()),
+    ('num_comments', pa.int32()),
+    # Segundos desde a época não cabem em float32 sem perder precisão.
+    ('created_utc', pa.float64()),
+    ('upvote_ratio', pa.float32()),
+    ('selftext', pa.string()),
+    ('link_flair_text', pa.dictionary(pa.int32(), pa.string())),
+    ('url', pa.string()),
+    ('hour_of_day', pa.int8()),
+    ('day_of_week', pa.int8()),
+    ('title_length', pa.int32()),
+    ('selftext_length', pa.int32()),
+    ('is_selfpost', pa.bool_()),
+    (PARTITION_COLUMN, pa.string()),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([SCHEMA.field(PARTITION_COLUMN)]), flavor='hive')
+
+
+def add_features(df, subreddit_name, clean=clean_series):
+    df = df.copy()
+    created = pd.to_datetime(df['created_utc'], unit='s')
+    df['hour_of_day'] = created.dt.hour
+    df['day_of_week'] = created.dt.dayofweek
+    df['title_length'] = df['title'].str.len()
+    df['selftext_length'] = clean(df['selftext']).str.len()
+    df['is_selfpost'] = df['url'].str.contains(f'reddit.com/r/{subreddit_name}/comments/')
+    return df
+
+
+def to_table(df):
+    return pa.Table.from_pandas(df[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+
+
+def dataset(path):
+    return ds.dataset(path, schema=SCHEMA, format='parquet', partitioning=PARTITIONING)
+
+
+def write_posts(df, path, append=False):
+    df = df.assign(**{PARTITION_COLUMN: pd.to_datetime(df['created_utc'], unit='s').dt.strftime('%Y-%m')})
+    if append and os.path.exists(path):
+        # Só as partições (meses) que recebem posts novos são lidas e reescritas.
+        months = df[PARTITION_COLUMN].unique().tolist()
+        existing = dataset(path).to_table(filter=pc.field(PARTITION_COLUMN).isin(months)).to_pandas()
+        df = pd.concat([existing, df], ignore_index=True).drop_duplicates('id', keep='last', ignore_index=True)
+    elif os.path.exists(path):
+        shutil.rmtree(path)
+
+    ds.write_dataset(to_table(df), path, format='parquet', partitioning=PARTITIONING,
+                     existing_data_behavior='delete_matching')
+
+
+def read_posts(path, columns=None, since=None, until=None):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns or SCHEMA.names)
+
+    condition = None
+    if since is not None:
+        condition = pc.field('created_utc') >= since
+    if until is not None:
+        before = pc.field('created_utc') < until
+        condition = before if condition is None else condition & before
+
+    if columns is None:
+        columns = [name for name in SCHEMA.names if name != PARTITION_COLUMN]
+    return dataset(path).to_table(columns=columns, filter=condition).to_pandas()
+
+
+def feature_matrix(path, columns, out_path, batch_size=BATCH_SIZE):
+    # Uma passada pelo dataset, na mesma ordem de read_posts: os atributos vão em blocos, como float32, para um
+    # .npy mapeado em memória. Linhas com valor ausente ficam de fora e são marcadas em `valid`.
+    source = dataset(path)
+    n_rows = source.count_rows()
+    matrix = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float32, shape=(n_rows, len(columns)))
+    valid = np.zeros(n_rows, dtype=bool)
+    start = filled = 0
+    for batch in source.to_batches(columns=columns, batch_size=batch_size):
+        block = np.column_stack([column.to_numpy(zero_copy_only=False) for column in batch.columns])
+        block = block.astype(np.float32, copy=False)
+        keep = ~np.isnan(block).any(axis=1)
+        matrix[filled:filled + keep.sum()] = block[keep]
+        valid[start:start + len(block)] = keep
+        start += len(block)
+        filled += keep.sum()
+    matrix.flush()
+    return matrix[:filled], valid
+
+
+def standardize(matrix, batch_size=BATCH_SIZE):
+    # Média e variância acumuladas bloco a bloco (partial_fit); a padronização é feita no próprio arquivo.
+    scaler = StandardScaler()
+    for start in range(0, len(matrix), batch_size):
+        scaler.partial_fit(matrix[start:start + batch_size])
+    for start in range(0, len(matrix), batch_size):
+        matrix[start:start + batch_size] = scaler.transform(matrix[start:start + batch_size], copy=False)
+    return scaler
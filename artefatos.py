@@ -0,0 +1,201 @@
+import glob
+import hashlib
+import os
+import pickle
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from limpeza import clean_series
+
+# Artefatos (textos limpos, matrizes e modelos ajustados) ficam em ARTIFACT_CACHE, chaveados pelo hash das
+# linhas de entrada e dos parâmetros da etapa; ARTIFACT_CACHE_MB limita o tamanho (0 desliga o cache).
+CACHE_DIR = os.environ.get('ARTIFACT_CACHE', 'artifact_cache')
+MAX_MB = float(os.environ.get('ARTIFACT_CACHE_MB', 1024))
+TEXTS_DB = 'cleaned_text.db'
+BATCH_SIZE = 50_000
+
+MISSING = object()
+
+
+def _update(digest, part):
+    if isinstance(part, pd.DataFrame):
+        digest.update(repr(list(part.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+    elif isinstance(part, (pd.Series, pd.Index)):
+        digest.update(pd.util.hash_pandas_object(part, index=isinstance(part, pd.Series)).to_numpy().tobytes())
+    elif sparse.issparse(part):
+        part = sparse.csr_matrix(part)
+        digest.update(repr((part.shape, part.dtype.str)).encode())
+        for array in (part.data, part.indices, part.indptr):
+            digest.update(np.ascontiguousarray(array))
+    elif isinstance(part, np.ndarray) and part.dtype == object:
+        digest.update(repr(part.shape).encode())
+        digest.update(pd.util.hash_array(part.ravel()).tobytes())
+    elif isinstance(part, np.ndarray):
+        # O buffer do array (ou do memmap) é lido direto, sem cópia em bytes.
+        digest.update(repr((part.shape, part.dtype.str)).encode())
+        digest.update(np.ascontiguousarray(part))
+    elif isinstance(part, dict):
+        for key in sorted(part):
+            _update(digest, key)
+            _update(digest, part[key])
+    elif isinstance(part, (list, tuple)):
+        digest.update(f"{type(part).__name__}{len(part)}".encode())
+        for item in part:
+            _update(digest, item)
+    else:
+        digest.update(repr(part).encode())
+    digest.update(b'|')
+
+
+def fingerprint(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        _update(digest, part)
+    return digest.hexdigest()
+
+
+def _save(path, value):
+    # Matriz esparsa -> .npz, array denso -> .npy (lido com mmap), o resto (estimadores) -> .pkl.
+    # O arquivo temporário leva o pid: processos paralelos podem gravar a mesma chave ao mesmo tempo.
+    extension = '.npz' if sparse.issparse(value) else '.npy' if isinstance(value, np.ndarray) else '.pkl'
+    path += extension
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        if extension == '.npz':
+            sparse.save_npz(f, value.tocsr(), compressed=False)
+        elif extension == '.npy':
+            np.save(f, value)
+        else:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
+
+
+def _load(path):
+    if path.endswith('.npz'):
+        return sparse.load_npz(path)
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class ArtifactCache:
+    def __init__(self, path=CACHE_DIR, max_mb=MAX_MB):
+        self.path = path
+        self.max_bytes = int(max_mb * 2 ** 20)
+        self.hits = 0
+        self.misses = 0
+        if self.enabled:
+            os.makedirs(path, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def files(self, key):
+        return sorted(path for path in glob.glob(os.path.join(self.path, f"{key}.*")) if not path.endswith('.tmp'))
+
+    def get(self, key, default=MISSING):
+        if not self.enabled:
+            return default
+        files = self.files(key)
+        if not files:
+            return default
+
+        # Tuplas são gravadas como uma parte por arquivo: <chave>.<i>of<n>.<extensão>.
+        parts = [os.path.basename(path).split('.')[1] for path in files]
+        if 'of' in parts[0]:
+            if len(files) != int(parts[0].split('of')[1]):
+                return default
+            files = sorted(files, key=lambda path: int(os.path.basename(path).split('.')[1].split('of')[0]))
+        try:
+            values = [_load(path) for path in files]
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            return default
+        for path in files:
+            os.utime(path)
+        return tuple(values) if 'of' in parts[0] else values[0]
+
+    def put(self, key, value):
+        if not self.enabled:
+            return value
+        base = os.path.join(self.path, key)
+        if isinstance(value, tuple):
+            for i, part in enumerate(value):
+                _save(f"{base}.{i}of{len(value)}", part)
+        else:
+            _save(base, value)
+        self.evict(keep=key)
+        return value
+
+    def evict(self, keep=None):
+        # LRU por chave: a data de modificação é renovada a cada leitura.
+        entries = {}
+        for path in glob.glob(os.path.join(self.path, '*.*')):
+            name = os.path.basename(path)
+            if name.startswith(TEXTS_DB) or name.endswith('.tmp'):
+                continue
+            stat = os.stat(path)
+            size, used = entries.get(name.split('.')[0], (0, 0))
+            entries[name.split('.')[0]] = (size + stat.st_size, max(used, stat.st_mtime))
+
+        total = sum(size for size, _ in entries.values())
+        for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in self.files(key):
+                os.remove(path)
+            total -= size
+
+    def cached(self, stage, compute, *inputs, **params):
+        key = f"{stage}-{fingerprint(stage, inputs, params)}"
+        value = self.get(key)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        return self.put(key, compute())
+
+    def connect(self):
+        # Vários processos (comparativo.py) podem gravar ao mesmo tempo.
+        conn = sqlite3.connect(os.path.join(self.path, TEXTS_DB), timeout=60)
+        conn.execute("CREATE TABLE IF NOT EXISTS cleaned (hash INTEGER PRIMARY KEY, text TEXT)")
+        return conn
+
+    def clean(self, texts):
+        # Limpeza texto a texto: cada texto é limpo uma vez e reaproveitado por qualquer script que o leia.
+        texts = pd.Series(texts, dtype=object)
+        if not self.enabled or texts.empty:
+            return clean_series(texts)
+
+        hashes = pd.util.hash_pandas_object(texts, index=False).to_numpy().view(np.int64)
+        unique = np.unique(hashes)
+        known = {}
+        with closing(self.connect()) as conn, conn:
+            for start in range(0, len(unique), BATCH_SIZE):
+                batch = unique[start:start + BATCH_SIZE].tolist()
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (hash INTEGER PRIMARY KEY)")
+                conn.execute("DELETE FROM wanted")
+                conn.executemany("INSERT INTO wanted VALUES (?)", ((value,) for value in batch))
+                known.update(conn.execute("SELECT c.hash, c.text FROM cleaned c JOIN wanted USING (hash)"))
+            # Fecha a transação da leitura antes de gravar: dois processos com lock de leitura tentando gravar
+            # ao mesmo tempo falham na hora com 'database is locked', sem esperar o timeout.
+            conn.commit()
+
+            missing = ~pd.Series(hashes).isin(known).to_numpy()
+            if missing.any():
+                first = ~pd.Series(hashes[missing]).duplicated().to_numpy()
+                new_hashes = hashes[missing][first]
+                new_texts = clean_series(texts[missing][first]).tolist()
+                conn.executemany("INSERT OR REPLACE INTO cleaned VALUES (?, ?)",
+                                 zip(new_hashes.tolist(), new_texts))
+                known.update(zip(new_hashes.tolist(), new_texts))
+        return pd.Series([known[value] for value in hashes.tolist()], index=texts.index, dtype=object)
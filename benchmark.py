@@ -0,0 +1,155 @@
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+import pandas as pd
+
+from coleta import POST_FIELDS, Cache, Collector, comments_by_post
+from instrumentacao import cpu_time, peak_rss_mb
+from sintetico import populate_cache, posts_for_items
+
+SIZES = [1_000, 10_000, 100_000]
+DATA_DIR = os.environ.get('BENCHMARK_DIR', 'benchmark_data')
+REPORT_PATH = os.environ.get('BENCHMARK_REPORT', 'benchmark.csv')
+SUBREDDIT = 'sintetico'
+QUERY = 'benchmark'
+
+
+def dataset_cache(n_items):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"sintetico_{n_items}.db")
+    cache = Cache(path)
+    n_posts = posts_for_items(n_items)
+    if cache.lookup((SUBREDDIT, QUERY, 'all'), n_posts, with_comments=True) is None:
+        print(f"Gerando base sintética com ~{n_items} itens em '{path}'...")
+        populate_cache(cache, SUBREDDIT, QUERY, n_posts)
+    return path, n_posts
+
+
+def load(path, n_posts, with_comments=False):
+    return Collector(cache=Cache(path)).collect(SUBREDDIT, QUERY, n_posts, with_comments=with_comments)
+
+
+def bench_caracterizacao(path, n_posts):
+    import centralidade
+    from grafo_posts import build_attribute_graph
+
+    df = pd.DataFrame(load(path, n_posts)[0], columns=POST_FIELDS)
+    adjacency = build_attribute_graph(df, 'num_comments', as_sparse=True)
+    centralidade.degree_centrality(adjacency)
+    centralidade.clustering(adjacency)
+    centralidade.eigenvector_centrality(adjacency)
+    return len(df)
+
+
+def bench_kdd(path, n_posts):
+    from sklearn.preprocessing import StandardScaler
+
+    from armazenamento import add_features
+    from qualidade import cluster_quality
+    from selecao_k import select_k
+
+    df = add_features(pd.DataFrame(load(path, n_posts)[0], columns=POST_FIELDS), SUBREDDIT)
+    X = StandardScaler().fit_transform(df[['score', 'num_comments', 'title_length', 'selftext_length', 'hour_of_day']])
+    selecao = select_k(X, range(1, 11))
+    cluster_quality(X, selecao.model.labels_, selecao.model.cluster_centers_)
+    return len(df)
+
+
+def bench_text_mining(path, n_posts):
+    from limpeza import clean_series, load_stopwords
+    from vetorizacao import StreamingTfidf, streaming_kmeans
+
+    cache = Cache(path)
+
+    def blocos():
+        for posts in cache.iter_posts((SUBREDDIT, QUERY, 'all')):
+            yield clean_series([post['selftext'] for post in posts])
+
+    vectorizer = StreamingTfidf(stopwords=load_stopwords())
+    for textos in blocos():
+        vectorizer.partial_fit(textos)
+    selecao = streaming_kmeans(blocos(), vectorizer)
+    for textos in blocos():
+        selecao.model.predict(vectorizer.transform(textos))
+    return vectorizer.n_documents
+
+
+def bench_comunidade(path, n_posts):
+    from corpus_autores import AuthorCorpus
+    from interacoes import interaction_edges, resolve_parents
+    from limpeza import clean_series, load_stopwords
+    from rede import InteractionGraph, community_labels
+    from topicos import community_keywords_from_corpus
+
+    posts, comments = load(path, n_posts, with_comments=True)
+    por_post = comments_by_post(comments)
+    corpus = AuthorCorpus(stopwords=load_stopwords())
+    corpos = dict(zip([comment['id'] for comment in comments], clean_series([comment['body'] for comment in comments])))
+    interacoes = []
+    for post in posts:
+        for comment, autor_pai in resolve_parents(post, por_post[post['id']]):
+            if comment['author'] != autor_pai:
+                interacoes.append((comment['author'], autor_pai))
+            corpus.add(comment['author'], corpos[comment['id']])
+
+    rede = InteractionGraph.from_edges(interaction_edges(interacoes))
+    rotulos = community_labels(rede)
+    membros = pd.Series(rede.names).groupby(rotulos).agg(list).to_dict()
+    community_keywords_from_corpus(corpus, membros)
+    return len(posts) + len(comments)
+
+
+PIPELINES = {
+    'caracterizacao': bench_caracterizacao,
+    'kdd': bench_kdd,
+    'text_mining': bench_text_mining,
+    'comunidade': bench_comunidade,
+}
+
+
+def run_case(pipeline, path, n_posts):
+    wall, cpu = time.perf_counter(), cpu_time()
+    items = PIPELINES[pipeline](path, n_posts)
+    wall, cpu = time.perf_counter() - wall, cpu_time() - cpu
+    return {
+        'wall_s': wall,
+        'cpu_s': cpu,
+        'peak_rss_mb': peak_rss_mb(),
+        'items': items,
+        'items_per_s': items / wall if wall else None,
+    }
+
+
+def run(sizes=SIZES, pipelines=tuple(PIPELINES)):
+    started_at = datetime.now().isoformat(timespec='seconds')
+    results = []
+    for n_items in sizes:
+        path, n_posts = dataset_cache(n_items)
+        for pipeline in pipelines:
+            # Cada caso roda em um processo novo para que o pico de memória seja só dele.
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+                result = pool.submit(run_case, pipeline, path, n_posts).result()
+            result = {'started_at': started_at, 'pipeline': pipeline, 'size': n_items, **result}
+            print(f"{pipeline:>15} | {n_items:>10} itens | {result['wall_s']:8.2f} s | "
+                  f"{result['items_per_s']:10.0f} itens/s | {result['peak_rss_mb'] or 0:8.1f} MB")
+            results.append(result)
+
+    novo = not os.path.exists(REPORT_PATH)
+    with open(REPORT_PATH, 'a', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]))
+        if novo:
+            writer.writeheader()
+        writer.writerows(results)
+    return results
+
+
+if __name__ == '__main__':
+    tamanhos = [int(size) for size in sys.argv[1:]] or SIZES
+    print(f"--- Benchmark dos pipelines com bases sintéticas de {tamanhos} itens ---")
+    run(tamanhos)
+    print(f"\nResultados anexados a '{REPORT_PATH}'.")
@@ -1,74 +1,91 @@
-import praw
+import os
+import numpy as np
 import pandas as pd
 import networkx as nx
 import matplotlib.pyplot as plt
-
-client_id = 'SEU_CLIENT_ID'
-client_secret = 'SEU_CLIENT_SECRET'
-user_agent = 'USER_AGENT'
-
-reddit = praw.Reddit(client_id=client_id, client_secret=client_secret, user_agent=user_agent)
-
-subreddit = reddit.subreddit("faculdadeBR")
-search_query = 'TCC'
-limit = 500
-
-posts = []
-for submission in subreddit.search(search_query, limit=limit):
-    posts.append({
-        'id': submission.id,
-        'title': submission.title,
-        'author': submission.author.name if submission.author else 'Unknown',
-        'score': submission.score,
-        'num_comments': submission.num_comments
-    })
-
-
-df = pd.DataFrame(posts)
-df.to_csv("posts_faculdade.csv", index=False)
-
-G = nx.Graph()
-
-for idx, post in enumerate(posts):
-    G.add_node(idx, title=post['title'], score=post['score'], num_comments=post['num_comments'])
-
-for i in range(len(posts)):
-    for j in range(i + 1, len(posts)):
-        if posts[i]['num_comments'] == posts[j]['num_comments']:
-            G.add_edge(i, j)
-
-num_nodes = G.number_of_nodes()
-num_edges = G.number_of_edges()
-degree_sequence = [G.degree(n) for n in G.nodes()]
-clustering_coeffs = nx.clustering(G)
-
-print(f"Número de vértices: {num_nodes}")
-print(f"Número de arestas: {num_edges}")
-print("Distribuição de graus (10 primeiros):", degree_sequence[:10])
-print("Coeficiente de clustering (10 primeiros):", list(clustering_coeffs.items())[:10])
-
-degree_centrality = nx.degree_centrality(G)
-
-if not nx.is_connected(G):
-    largest_cc = max(nx.connected_components(G), key=len)
-    subG = G.subgraph(largest_cc)
-    eigenvector_centrality = nx.eigenvector_centrality(subG, max_iter=1000)
-    eigenvector_centrality = {node: eigenvector_centrality.get(node, 0) for node in G.nodes()}
-else:
-    eigenvector_centrality = nx.eigenvector_centrality(G, max_iter=1000)
-
-print("Centralidade de grau (nó 0):", degree_centrality.get(0, 0))
-print("Centralidade de eigenvector (nó 0):", eigenvector_centrality.get(0, 0))
-
-plt.figure(figsize=(12, 10))
-
-pos = nx.spring_layout(G, seed=42)
-
-node_size = [5000 * degree_centrality.get(node, 0) for node in G.nodes()]
-node_color = [eigenvector_centrality.get(node, 0) for node in G.nodes()]
-
-nx.draw(G, pos, with_labels=True, node_size=node_size, node_color=node_color,
-        cmap=plt.cm.Blues, font_size=10, font_weight='bold')
-
-plt.title("Rede de Posts - Faculdade / TCC (por número de comentários)")
-plt.show()
\ No newline at end of file
+from armazenamento import add_features, write_posts
+from artefatos import ArtifactCache
+import centralidade
+from coleta import POST_FIELDS, load_posts
+from grafo_posts import build_attribute_graph
+from instrumentacao import RunReport
+from rede import SPRING_LAYOUT_LIMIT
+from renderizacao import grouped_layout, show, top_nodes, wait
+
+RENDER_TOP_K = int(os.environ.get('RENDER_TOP_K', 20))
+
+
+def main(subreddit_name='faculdadeBR', search_query='TCC', limit=500):
+    relatorio = RunReport('caracterizacao')
+
+    etapa = relatorio.start('coleta')
+    df = pd.DataFrame(load_posts(subreddit_name, search_query, limit), columns=POST_FIELDS)
+    etapa['rows'] = len(df)
+
+    relatorio.start('atributos')
+    write_posts(add_features(df, subreddit_name, clean=ArtifactCache().clean), "posts_faculdade")
+
+    etapa = relatorio.start('grafo')
+    adjacency = build_attribute_graph(df, 'num_comments', as_sparse=True)
+    etapa['rows'], etapa['edges'] = adjacency.shape[0], adjacency.nnz // 2
+
+    relatorio.start('centralidade')
+
+    num_nodes = adjacency.shape[0]
+    num_edges = adjacency.nnz // 2
+    degree_sequence = centralidade.degrees(adjacency)
+    clustering_coeffs = centralidade.clustering(adjacency)
+
+    print(f"Número de vértices: {num_nodes}")
+    print(f"Número de arestas: {num_edges}")
+    print("Distribuição de graus (10 primeiros):", degree_sequence[:10].tolist())
+    print("Coeficiente de clustering (10 primeiros):", list(enumerate(clustering_coeffs[:10].tolist())))
+
+    degree_centrality = centralidade.degree_centrality(adjacency)
+    eigenvector_centrality = centralidade.eigenvector_centrality(adjacency)
+
+    print("Centralidade de grau (nó 0):", degree_centrality[0] if num_nodes else 0)
+    print("Centralidade de eigenvector (nó 0):", eigenvector_centrality[0] if num_nodes else 0)
+
+    # Betweenness aproximada (opcional): número de fontes amostradas em BETWEENNESS_AMOSTRA.
+    amostra_betweenness = int(os.environ.get('BETWEENNESS_AMOSTRA', 0))
+    if amostra_betweenness:
+        betweenness_centrality = centralidade.betweenness(adjacency, k=amostra_betweenness, random_state=42)
+        print(f"Betweenness aproximada com {amostra_betweenness} fontes (nó 0):",
+              betweenness_centrality[0] if num_nodes else 0)
+
+    relatorio.start('layout')
+    plt.figure(figsize=(12, 10))
+    grande = num_nodes > SPRING_LAYOUT_LIMIT
+    desenhados = np.arange(num_nodes)
+    if grande:
+        # Só os RENDER_TOP_K posts de maior grau de cada componente (posts com o mesmo número de comentários)
+        # são desenhados, cada componente em um disco próprio.
+        componentes = centralidade.components(adjacency)
+        desenhados = top_nodes(adjacency, componentes, RENDER_TOP_K)
+        componentes = componentes[desenhados]
+    # O grafo do NetworkX só é montado para o desenho, a partir da matriz esparsa.
+    sub_adjacency = adjacency[desenhados][:, desenhados]
+    G = nx.relabel_nodes(nx.from_scipy_sparse_array(sub_adjacency), dict(enumerate(desenhados.tolist())))
+
+    if grande:
+        print(f"Desenhando {len(desenhados)} de {num_nodes} posts (até {RENDER_TOP_K} por componente).")
+        pos = dict(zip(desenhados.tolist(), grouped_layout(sub_adjacency, componentes, seed=42)))
+    else:
+        pos = nx.spring_layout(G, seed=42)
+
+    relatorio.start('renderizacao')
+    node_size = 5000 * degree_centrality[desenhados]
+    node_color = eigenvector_centrality[desenhados]
+
+    nx.draw(G, pos, nodelist=desenhados.tolist(), with_labels=not grande, node_size=node_size,
+            node_color=node_color, cmap=plt.cm.Blues, font_size=10, font_weight='bold')
+
+    plt.title("Rede de Posts - Faculdade / TCC (por número de comentários)")
+    show('caracterizacao_rede')
+    wait()
+    relatorio.finish()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from scipy.sparse.linalg import eigsh
+
+
+def binary_adjacency(adjacency):
+    adjacency = sparse.csr_matrix(adjacency, dtype=np.float64)
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    adjacency.data[:] = 1
+    return adjacency
+
+
+def degrees(adjacency):
+    return np.diff(sparse.csr_matrix(adjacency).indptr)
+
+
+def degree_centrality(adjacency):
+    n = adjacency.shape[0]
+    if n <= 1:
+        return np.ones(n)
+    return degrees(adjacency) / (n - 1)
+
+
+def components(adjacency):
+    return csgraph.connected_components(adjacency, directed=False)[1]
+
+
+def largest_component(adjacency):
+    labels = components(adjacency)
+    if labels.max(initial=0) == 0:
+        return np.arange(adjacency.shape[0])
+    return np.flatnonzero(labels == np.argmax(np.bincount(labels)))
+
+
+def eigenvector_centrality(adjacency, tol=1e-6, max_iter=1000):
+    # Como no código anterior, só a maior componente recebe valores; os demais nós ficam com 0.
+    adjacency = sparse.csr_matrix(adjacency, dtype=np.float64)
+    nodes = largest_component(adjacency)
+    sub = adjacency[nodes][:, nodes]
+
+    if len(nodes) < 3:
+        _, vectors = np.linalg.eigh(sub.toarray())
+    else:
+        _, vectors = eigsh(sub, k=1, which='LA', tol=tol, maxiter=max_iter * len(nodes))
+    vector = np.abs(vectors[:, -1])
+
+    centrality = np.zeros(adjacency.shape[0])
+    centrality[nodes] = vector / np.linalg.norm(vector)
+    return centrality
+
+
+def triangles(adjacency):
+    adjacency = binary_adjacency(adjacency)
+    degree = degrees(adjacency)
+    _, labels = csgraph.connected_components(adjacency, directed=False)
+    sizes = np.bincount(labels)
+    edges = np.bincount(labels, weights=degree) / 2
+
+    # Componentes completas (os grupos de mesmo num_comments) têm contagem fechada;
+    # o produto esparso fica só para o restante do grafo.
+    complete = (edges == sizes * (sizes - 1) / 2)[labels]
+    counts = (sizes[labels] - 1) * (sizes[labels] - 2) / 2
+    rest = np.flatnonzero(~complete)
+    if len(rest):
+        sub = adjacency[rest][:, rest]
+        counts[rest] = np.asarray((sub @ sub).multiply(sub).sum(axis=1)).ravel() / 2
+    return counts
+
+
+def clustering(adjacency):
+    degree = degrees(binary_adjacency(adjacency)).astype(float)
+    possible = degree * (degree - 1)
+    coefficients = np.zeros(len(degree))
+    np.divide(2 * triangles(adjacency), possible, out=coefficients, where=possible > 0)
+    return coefficients
+
+
+def _dependencies(adjacency, source):
+    # Brandes com BFS por níveis: cada nível é um produto matriz-vetor esparso.
+    n = adjacency.shape[0]
+    sigma = np.zeros(n)
+    sigma[source] = 1
+    visited = np.zeros(n, dtype=bool)
+    visited[source] = True
+    levels = [np.array([source])]
+
+    frontier = np.zeros(n)
+    frontier[source] = 1
+    while True:
+        reached = adjacency @ frontier
+        reached[visited] = 0
+        level = np.flatnonzero(reached)
+        if not len(level):
+            break
+        sigma[level] = reached[level]
+        visited[level] = True
+        levels.append(level)
+        frontier = np.zeros(n)
+        frontier[level] = sigma[level]
+
+    delta = np.zeros(n)
+    for upper, lower in zip(levels[-2::-1], levels[:0:-1]):
+        weights = np.zeros(n)
+        weights[lower] = (1 + delta[lower]) / sigma[lower]
+        delta[upper] = sigma[upper] * (adjacency @ weights)[upper]
+    delta[source] = 0
+    return delta
+
+
+def betweenness(adjacency, k=None, normalized=True, random_state=None):
+    adjacency = binary_adjacency(adjacency)
+    n = adjacency.shape[0]
+    sources = np.arange(n)
+    if k is not None and k < n:
+        sources = np.random.default_rng(random_state).choice(n, k, replace=False)
+
+    centrality = np.zeros(n)
+    for source in sources:
+        centrality += _dependencies(adjacency, source)
+
+    # Mesma escala do NetworkX: pares ordenados e, com amostragem, extrapolação para n fontes.
+    if normalized:
+        scale = 1 / ((n - 1) * (n - 2)) if n > 2 else 1.0
+    else:
+        scale = 0.5
+    return centrality * scale * n / len(sources) if len(sources) else centrality
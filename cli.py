@@ -0,0 +1,99 @@
+import argparse
+import sys
+
+# Cada subcomando importa o seu script só quando é chamado: pandas, sklearn, matplotlib e networkx
+# ficam fora da partida do processo, e `collect` depende apenas da biblioteca padrão (e do praw, se for à API).
+
+SUBREDDIT = 'faculdadeBR'
+QUERY = 'TCC'
+
+
+def collect(args):
+    from coleta import load_new_posts, load_posts, load_posts_with_comments
+
+    if args.new:
+        posts, comments = load_new_posts(args.subreddit, args.query), []
+    elif args.comments:
+        posts, comments = load_posts_with_comments(args.subreddit, args.query, args.limit)
+    else:
+        posts, comments = load_posts(args.subreddit, args.query, args.limit), []
+    print(f"{len(posts)} posts e {len(comments)} comentários de '{args.subreddit}' com a query '{args.query}' no cache.")
+
+
+def characterize(args):
+    import caracterizacao
+    caracterizacao.main(args.subreddit, args.query, args.limit)
+
+
+def kdd(args):
+    import kdd
+    kdd.main(args.subreddit, args.query, args.limit, incremental=args.incremental or kdd.INCREMENTAL)
+
+
+def topics(args):
+    import text_mining
+    text_mining.main(args.subreddit, args.query, args.limit, streaming=args.streaming or text_mining.STREAMING)
+
+
+def communities(args):
+    import comunidade
+    comunidade.main(args.subreddit, args.query, args.limit)
+
+
+def windows(args):
+    import janelas
+    janelas.main(args.subreddit, args.query, args.limit, window=args.window, stride_days=args.stride)
+
+
+def compare(args):
+    import comparativo
+    targets = comparativo.read_targets(args.targets) if args.targets else []
+    targets += [comparativo.parse_target(target) for target in args.target]
+    comparativo.run(targets, max_workers=args.workers)
+
+
+def parser():
+    parser = argparse.ArgumentParser(prog='cli.py', description="Análises do Reddit: coleta, KDD, tópicos e comunidades.")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    def subcommand(name, handler, help, limit):
+        sub = subcommands.add_parser(name, help=help)
+        sub.add_argument('--subreddit', default=SUBREDDIT)
+        sub.add_argument('--query', default=QUERY)
+        sub.add_argument('--limit', type=int, default=limit)
+        sub.set_defaults(handler=handler)
+        return sub
+
+    sub = subcommand('collect', collect, "coleta posts (e comentários) para o cache local", 150)
+    sub.add_argument('--comments', action='store_true', help="coleta também os comentários")
+    sub.add_argument('--new', action='store_true', help="coleta apenas posts mais novos que os do cache")
+
+    subcommand('characterize', characterize, "grafo de posts e centralidades", 500)
+
+    sub = subcommand('kdd', kdd, "KDD e K-Means sobre os metadados dos posts", 150)
+    sub.add_argument('--incremental', action='store_true', help="anexa só os posts novos à base Parquet")
+
+    sub = subcommand('topics', topics, "modelagem de tópicos com TF-IDF e K-Means", 150)
+    sub.add_argument('--streaming', action='store_true', help="processa em blocos os posts já coletados")
+
+    subcommand('communities', communities, "rede de interações e comunidades de Louvain", 50)
+
+    sub = subcommand('windows', windows, "rede de interações e comunidades em janelas deslizantes de tempo", 150)
+    sub.add_argument('--window', choices=['day', 'week'], default='week')
+    sub.add_argument('--stride', type=float, help="passo entre janelas, em dias (padrão: o tamanho da janela)")
+
+    sub = subcommands.add_parser('compare', help="KDD, tópicos e comunidades para vários subreddits/queries em paralelo")
+    sub.add_argument('target', nargs='*', help="alvo no formato subreddit:query:limite")
+    sub.add_argument('--targets', help="CSV com as colunas subreddit, query e limit")
+    sub.add_argument('--workers', type=int, default=2)
+    sub.set_defaults(handler=compare)
+    return parser
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,435 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+from interacoes import UNKNOWN_AUTHOR, author_name, flatten_submission
+
+client_id = os.environ.get('REDDIT_CLIENT_ID', 'SEU_CLIENT_ID')
+client_secret = os.environ.get('REDDIT_CLIENT_SECRET', 'SEU_CLIENT_SECRET')
+user_agent = os.environ.get('REDDIT_USER_AGENT', 'USER_AGENT')
+
+CACHE_PATH = os.environ.get('REDDIT_CACHE', 'reddit_cache.db')
+REPLAY_DIR = os.environ.get('REDDIT_REPLAY_DIR')
+RECORD_DIR = os.environ.get('REDDIT_RECORD_DIR')
+
+# A API OAuth do Reddit permite 100 requisições por minuto.
+REQUESTS_PER_SECOND = 100 / 60
+PAGE_SIZE = 100
+HOT_WINDOW = 3 * 24 * 3600
+CHUNK_SIZE = 10_000
+
+_request_lock = threading.Lock()
+_request_total = 0
+
+POST_FIELDS = ['id', 'title', 'author', 'score', 'num_comments', 'created_utc', 'upvote_ratio', 'selftext',
+               'link_flair_text', 'url']
+
+
+def request_count():
+    return _request_total
+
+
+def post_record(submission):
+    return {
+        'id': submission.id,
+        'title': submission.title,
+        'author': author_name(submission) or UNKNOWN_AUTHOR,
+        'score': submission.score,
+        'num_comments': submission.num_comments,
+        'created_utc': submission.created_utc,
+        'upvote_ratio': submission.upvote_ratio,
+        'selftext': submission.selftext,
+        'link_flair_text': submission.link_flair_text,
+        'url': submission.url
+    }
+
+
+class TokenBucket:
+    def __init__(self, rate=REQUESTS_PER_SECOND, capacity=10):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class PrawSource:
+    def __init__(self, limiter=None):
+        self.limiter = limiter or TokenBucket()
+        self.local = threading.local()
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def reddit(self):
+        # Instâncias do PRAW não são thread-safe: uma por thread.
+        if not hasattr(self.local, 'reddit'):
+            import praw
+            self.local.reddit = praw.Reddit(client_id=client_id, client_secret=client_secret, user_agent=user_agent)
+        return self.local.reddit
+
+    def request(self):
+        global _request_total
+        self.limiter.acquire()
+        with self.lock:
+            self.requests += 1
+        with _request_lock:
+            _request_total += 1
+
+    def search(self, subreddit_name, query, limit, time_filter='all', sort='relevance', since=None):
+        subreddit = self.reddit().subreddit(subreddit_name)
+        posts = []
+        for i, submission in enumerate(subreddit.search(query, sort=sort, limit=limit, time_filter=time_filter)):
+            if i % PAGE_SIZE == 0:
+                self.request()
+            if since is not None and submission.created_utc < since:
+                break
+            posts.append(post_record(submission))
+        return posts
+
+    def comments(self, post_id):
+        self.request()
+        submission = self.reddit().submission(id=post_id)
+        return flatten_submission(submission)[1]
+
+
+def fixture_name(subreddit_name, query, time_filter):
+    return f"{subreddit_name}__{query}__{time_filter}.json".replace('/', '_')
+
+
+class ReplaySource:
+    def __init__(self, fixtures_dir):
+        self.fixtures_dir = fixtures_dir
+        self.requests = 0
+        self.comments_by_post = {}
+
+    def search(self, subreddit_name, query, limit, time_filter='all', sort='relevance', since=None):
+        with open(os.path.join(self.fixtures_dir, fixture_name(subreddit_name, query, time_filter)),
+                  encoding='utf-8') as f:
+            fixture = json.load(f)
+        self.comments_by_post.update(fixture.get('comments', {}))
+        posts = fixture['posts']
+        if sort == 'new':
+            posts = sorted(posts, key=lambda post: post['created_utc'], reverse=True)
+        if since is not None:
+            posts = [post for post in posts if post['created_utc'] >= since]
+        return posts[:limit]
+
+    def comments(self, post_id):
+        return self.comments_by_post.get(post_id, [])
+
+
+def record_fixture(fixtures_dir, subreddit_name, query, time_filter, posts, comments):
+    os.makedirs(fixtures_dir, exist_ok=True)
+    with open(os.path.join(fixtures_dir, fixture_name(subreddit_name, query, time_filter)), 'w',
+              encoding='utf-8') as f:
+        json.dump({'posts': posts, 'comments': comments_by_post(comments)}, f, ensure_ascii=False)
+
+
+class Cache:
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        with closing(self.connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS collections (
+                    subreddit TEXT, query TEXT, time_filter TEXT,
+                    post_limit INTEGER, with_comments INTEGER, fetched_at REAL,
+                    PRIMARY KEY (subreddit, query, time_filter)
+                );
+                CREATE TABLE IF NOT EXISTS posts (
+                    subreddit TEXT, query TEXT, time_filter TEXT, id TEXT,
+                    rank INTEGER, created_utc REAL, data TEXT, with_comments INTEGER DEFAULT 0,
+                    PRIMARY KEY (subreddit, query, time_filter, id)
+                );
+                CREATE TABLE IF NOT EXISTS comments (
+                    id TEXT PRIMARY KEY, link_id TEXT, created_utc REAL, data TEXT
+                );
+                CREATE INDEX IF NOT EXISTS comments_link_id ON comments (link_id);
+                CREATE TABLE IF NOT EXISTS watermarks (
+                    subreddit TEXT, query TEXT, time_filter TEXT,
+                    last_created_utc REAL, seen_ids TEXT,
+                    PRIMARY KEY (subreddit, query, time_filter)
+                );
+            """)
+            # Caches antigos marcavam os comentários só por coleção; a marca agora é por post.
+            if 'with_comments' not in {column for _, column, *_ in conn.execute("PRAGMA table_info(posts)")}:
+                conn.execute("ALTER TABLE posts ADD COLUMN with_comments INTEGER DEFAULT 0")
+                conn.execute("""
+                    UPDATE posts SET with_comments = 1 WHERE EXISTS (
+                        SELECT 1 FROM collections c WHERE c.with_comments AND c.subreddit = posts.subreddit
+                        AND c.query = posts.query AND c.time_filter = posts.time_filter
+                    )
+                """)
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=60)
+
+    def lookup(self, key, limit, with_comments=False):
+        with closing(self.connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT post_limit, with_comments FROM collections WHERE subreddit = ? AND query = ? AND time_filter = ?",
+                key
+            ).fetchone()
+            if row is None or row[0] < limit:
+                return None
+
+            rows = conn.execute(
+                "SELECT data, with_comments FROM posts WHERE subreddit = ? AND query = ? AND time_filter = ? "
+                "ORDER BY rank LIMIT ?",
+                (*key, limit)
+            ).fetchall()
+            if with_comments and not all(flag for _, flag in rows):
+                return None
+            posts = [json.loads(data) for data, _ in rows]
+            comments = []
+            if with_comments:
+                ids = [post['id'] for post in posts]
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    comments.extend(json.loads(data) for data, in conn.execute(
+                        f"SELECT data FROM comments WHERE link_id IN ({','.join('?' * len(chunk))})", chunk
+                    ))
+        return posts, comments
+
+    def store(self, key, limit, with_comments, posts, comments):
+        # A coleção nunca encolhe: os posts da nova busca ocupam as primeiras posições e os demais já
+        # guardados (de buscas maiores ou de coletas incrementais) seguem depois, na ordem em que estavam.
+        with closing(self.connect()) as conn, conn:
+            ids = {post['id'] for post in posts}
+            restantes = [post_id for post_id, in conn.execute(
+                "SELECT id FROM posts WHERE subreddit = ? AND query = ? AND time_filter = ? ORDER BY rank", key
+            ) if post_id not in ids]
+            conn.executemany(
+                "UPDATE posts SET rank = ? WHERE subreddit = ? AND query = ? AND time_filter = ? AND id = ?",
+                [(rank, *key, post_id) for rank, post_id in enumerate(restantes, start=len(posts))]
+            )
+            self.insert(conn, key, posts, comments, with_comments=with_comments)
+            row = conn.execute(
+                "SELECT post_limit, with_comments FROM collections WHERE subreddit = ? AND query = ? AND time_filter = ?",
+                key
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO collections VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, max(limit, row[0] if row else 0), int(with_comments or bool(row and row[1])), time.time())
+            )
+
+    def insert(self, conn, key, posts, comments, first_rank=0, with_comments=False):
+        # Regravar um post numa busca sem comentários não apaga a marca dos comentários já guardados.
+        conn.executemany(
+            "INSERT INTO posts (subreddit, query, time_filter, id, rank, created_utc, data, with_comments) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (subreddit, query, time_filter, id) DO UPDATE SET rank = excluded.rank, "
+            "created_utc = excluded.created_utc, data = excluded.data, "
+            "with_comments = MAX(with_comments, excluded.with_comments)",
+            [(*key, post['id'], rank, post['created_utc'], json.dumps(post, ensure_ascii=False), int(with_comments))
+             for rank, post in enumerate(posts, start=first_rank)]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO comments VALUES (?, ?, ?, ?)",
+            [(c['id'], c['link_id'], c['created_utc'], json.dumps(c, ensure_ascii=False)) for c in comments]
+        )
+
+    def add_comments(self, key, post_ids, comments):
+        # Comentários dos posts já guardados: a coleção e a ordem dos posts não mudam.
+        with closing(self.connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO comments VALUES (?, ?, ?, ?)",
+                [(c['id'], c['link_id'], c['created_utc'], json.dumps(c, ensure_ascii=False)) for c in comments]
+            )
+            conn.executemany(
+                "UPDATE posts SET with_comments = 1 WHERE subreddit = ? AND query = ? AND time_filter = ? AND id = ?",
+                [(*key, post_id) for post_id in post_ids]
+            )
+
+    def posts_without_comments(self, key, limit):
+        with closing(self.connect()) as conn:
+            return [post_id for post_id, flag in conn.execute(
+                "SELECT id, with_comments FROM posts WHERE subreddit = ? AND query = ? AND time_filter = ? "
+                "ORDER BY rank LIMIT ?",
+                (*key, limit)
+            ) if not flag]
+
+    def posts_by_id(self, key, post_ids):
+        post_ids = list(post_ids)
+        posts = []
+        with closing(self.connect()) as conn:
+            for start in range(0, len(post_ids), 500):
+                chunk = post_ids[start:start + 500]
+                posts.extend(json.loads(data) for data, in conn.execute(
+                    "SELECT data FROM posts WHERE subreddit = ? AND query = ? AND time_filter = ? "
+                    f"AND id IN ({','.join('?' * len(chunk))})",
+                    (*key, *chunk)
+                ))
+        return posts
+
+    def append(self, key, posts, comments, with_comments=False):
+        with closing(self.connect()) as conn, conn:
+            known = {post_id for post_id, in conn.execute(
+                "SELECT id FROM posts WHERE subreddit = ? AND query = ? AND time_filter = ?", key
+            )}
+            novos = [post for post in posts if post['id'] not in known]
+            first_rank, = conn.execute(
+                "SELECT COALESCE(MAX(rank) + 1, 0) FROM posts WHERE subreddit = ? AND query = ? AND time_filter = ?",
+                key
+            ).fetchone()
+            self.insert(conn, key, novos, comments, first_rank, with_comments)
+            row = conn.execute(
+                "SELECT post_limit, with_comments FROM collections WHERE subreddit = ? AND query = ? AND time_filter = ?",
+                key
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO collections VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, max(len(known) + len(novos), row[0] if row else 0), int(with_comments or bool(row and row[1])),
+                 time.time())
+            )
+        return novos
+
+    def watermark(self, key):
+        with closing(self.connect()) as conn:
+            row = conn.execute(
+                "SELECT last_created_utc, seen_ids FROM watermarks WHERE subreddit = ? AND query = ? AND time_filter = ?",
+                key
+            ).fetchone()
+            if row is None:
+                # Sem marca gravada (cache preenchido por collect): parte do post mais recente já no cache.
+                seen = conn.execute(
+                    "SELECT created_utc, id FROM posts WHERE subreddit = ? AND query = ? AND time_filter = ? "
+                    "AND created_utc = (SELECT MAX(created_utc) FROM posts "
+                    "WHERE subreddit = ? AND query = ? AND time_filter = ?)",
+                    (*key, *key)
+                ).fetchall()
+                return (seen[0][0] if seen else None), {post_id for _, post_id in seen}
+        return row[0], set(json.loads(row[1]))
+
+    def update_watermark(self, key, posts):
+        last_created_utc, seen_ids = self.watermark(key)
+        for post in posts:
+            if last_created_utc is None or post['created_utc'] > last_created_utc:
+                last_created_utc, seen_ids = post['created_utc'], {post['id']}
+            elif post['created_utc'] == last_created_utc:
+                seen_ids.add(post['id'])
+        with closing(self.connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?, ?)",
+                (*key, last_created_utc, json.dumps(sorted(seen_ids)))
+            )
+
+    def post_ids(self, key, since=None):
+        with closing(self.connect()) as conn:
+            return [post_id for post_id, in conn.execute(
+                "SELECT id FROM posts WHERE subreddit = ? AND query = ? AND time_filter = ? AND created_utc >= ?",
+                (*key, since if since is not None else float('-inf'))
+            )]
+
+    def iter_posts(self, key, chunk_size=CHUNK_SIZE):
+        with closing(self.connect()) as conn:
+            cursor = conn.execute(
+                "SELECT data FROM posts WHERE subreddit = ? AND query = ? AND time_filter = ? ORDER BY rank", key
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [json.loads(data) for data, in rows]
+
+
+class Collector:
+    def __init__(self, source=None, cache=None, max_workers=8):
+        if source is None:
+            source = ReplaySource(REPLAY_DIR) if REPLAY_DIR else PrawSource()
+        self.source = source
+        self.cache = cache or Cache()
+        self.max_workers = max_workers
+
+    def collect(self, subreddit_name, query, limit, time_filter='all', with_comments=False, refresh=False):
+        key = (subreddit_name, query, time_filter)
+        if not refresh:
+            cached = self.cache.lookup(key, limit, with_comments)
+            if cached is not None:
+                return cached
+            if with_comments and self.cache.lookup(key, limit) is not None:
+                # Os posts já estão no cache e só faltam comentários: não refaz a busca.
+                faltando = self.cache.posts_without_comments(key, limit)
+                self.cache.add_comments(key, faltando, self.fetch_comments(faltando))
+                return self.cache.lookup(key, limit, with_comments)
+
+        posts = self.source.search(subreddit_name, query, limit, time_filter)
+        comments = []
+        if with_comments:
+            comments = self.fetch_comments([post['id'] for post in posts])
+
+        self.cache.store(key, limit, with_comments, posts, comments)
+        if RECORD_DIR:
+            record_fixture(RECORD_DIR, subreddit_name, query, time_filter, posts, comments)
+        return posts, comments
+
+    def fetch_comments(self, post_ids):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return [comment for comments in pool.map(self.source.comments, post_ids) for comment in comments]
+
+    def collect_incremental(self, subreddit_name, query, time_filter='all', with_comments=False,
+                            hot_window=HOT_WINDOW, limit=None):
+        key = (subreddit_name, query, time_filter)
+        last_created_utc, seen_ids = self.cache.watermark(key)
+
+        posts = self.source.search(subreddit_name, query, limit, time_filter, sort='new', since=last_created_utc)
+        posts = [post for post in posts if post['id'] not in seen_ids]
+
+        comments = []
+        if with_comments:
+            quentes = set(self.cache.post_ids(key, since=time.time() - hot_window))
+            quentes.update(post['id'] for post in posts)
+            comments = self.fetch_comments(sorted(quentes))
+
+        novos = self.cache.append(key, posts, comments, with_comments)
+        # A marca avança com tudo o que a busca trouxe, inclusive posts que já estavam no cache.
+        self.cache.update_watermark(key, posts)
+        return novos, comments
+
+    def collect_many(self, targets, time_filter='all', with_comments=False, refresh=False):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                (subreddit_name, query): pool.submit(self.collect, subreddit_name, query, limit, time_filter,
+                                                     with_comments, refresh)
+                for subreddit_name, query, limit in targets
+            }
+            return {target: future.result() for target, future in futures.items()}
+
+
+def load_posts(subreddit_name, query, limit, **kwargs):
+    return Collector().collect(subreddit_name, query, limit, **kwargs)[0]
+
+
+def load_new_posts(subreddit_name, query, **kwargs):
+    return Collector().collect_incremental(subreddit_name, query, **kwargs)[0]
+
+
+def iter_posts(subreddit_name, query, time_filter='all', chunk_size=CHUNK_SIZE):
+    return Cache().iter_posts((subreddit_name, query, time_filter), chunk_size)
+
+
+def load_posts_with_comments(subreddit_name, query, limit, **kwargs):
+    return Collector().collect(subreddit_name, query, limit, with_comments=True, **kwargs)
+
+
+def comments_by_post(comments):
+    grouped = defaultdict(list)
+    for comment in comments:
+        grouped[comment['link_id']].append(comment)
+    return grouped
@@ -0,0 +1,176 @@
+import csv
+import json
+import os
+import re
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from datetime import datetime
+from multiprocessing import get_context
+
+from coleta import load_posts_with_comments
+
+# Cada alvo (subreddit, query, limite) roda KDD, tópicos e comunidades em um processo próprio; o cache do Reddit
+# e o de artefatos são compartilhados entre os processos.
+OUTPUT_DIR = os.environ.get('COMPARATIVO_DIR', 'comparativo')
+MAX_WORKERS = int(os.environ.get('COMPARATIVO_WORKERS', 2))
+TOP_TERMS = 5
+
+
+def parse_target(text):
+    subreddit_name, query, limit = text.rsplit(':', 2)
+    return subreddit_name, query, int(limit)
+
+
+def read_targets(path):
+    # CSV com as colunas subreddit, query e limit, um alvo por linha.
+    with open(path, encoding='utf-8', newline='') as f:
+        return [(row['subreddit'], row['query'], int(row['limit'])) for row in csv.DictReader(f)]
+
+
+def slug(subreddit_name, query, limit):
+    return re.sub(r'[^\w-]+', '_', f"{subreddit_name}_{query}_{limit}").strip('_')
+
+
+def plain(value):
+    # Tipos do NumPy/pandas viram tipos nativos para o JSON (inclusive as chaves dos dicionários).
+    if isinstance(value, dict):
+        return {str(plain(key)): plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+def run_target(subreddit_name, query, limit, output_dir=OUTPUT_DIR):
+    # Saída, figuras, relatórios e bases do alvo ficam no diretório dele; o ambiente é ajustado antes de importar
+    # os scripts porque renderizacao e instrumentacao leem as variáveis na importação.
+    target_dir = os.path.abspath(os.path.join(output_dir, slug(subreddit_name, query, limit)))
+    os.makedirs(target_dir, exist_ok=True)
+    os.environ['RENDER_DIR'] = os.path.join(target_dir, 'figuras')
+    os.makedirs(os.environ['RENDER_DIR'], exist_ok=True)
+    if os.environ.get('RUN_REPORT_DIR'):
+        os.environ['RUN_REPORT_DIR'] = os.path.join(target_dir, 'relatorios')
+    os.environ.pop('COMUNIDADE_ESTADO', None)
+    os.environ.pop('CORPUS_AUTORES', None)
+
+    import comunidade
+    import kdd
+    import text_mining
+
+    analyses = {
+        'kdd': lambda: kdd.main(subreddit_name, query, limit, incremental=False,
+                                dataset_path=os.path.join(target_dir, 'posts'),
+                                features_path=os.path.join(target_dir, 'features.npy')),
+        'topics': lambda: text_mining.main(subreddit_name, query, limit, streaming=False),
+        'communities': lambda: comunidade.main(subreddit_name, query, limit),
+    }
+    result = {'errors': []}
+    with open(os.path.join(target_dir, 'saida.txt'), 'w', encoding='utf-8') as log, redirect_stdout(log):
+        for name, analysis in analyses.items():
+            try:
+                result[name] = analysis()
+            except Exception:
+                traceback.print_exc(file=log)
+                result['errors'].append(f"{name}: {traceback.format_exc(limit=1).strip().splitlines()[-1]}")
+    return plain(result)
+
+
+def run_isolated(target, output_dir=OUTPUT_DIR):
+    # Um processo novo por alvo: o estado dos módulos de um alvo não vaza para o próximo.
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(run_target, *target, output_dir).result()
+
+
+def summary_row(target, result):
+    subreddit_name, query, limit = target
+    kdd = result.get('kdd') or {}
+    topics = result.get('topics') or {}
+    communities = result.get('communities') or {}
+    community_sizes = communities.get('community_sizes') or {}
+    return {
+        'subreddit': subreddit_name,
+        'query': query,
+        'limit': limit,
+        'posts': kdd.get('posts'),
+        'kdd_k': kdd.get('k'),
+        'kdd_silhouette': kdd.get('silhouette'),
+        'kdd_cluster_sizes': json.dumps(kdd.get('cluster_sizes')),
+        'topics_k': topics.get('k'),
+        'topics_cluster_sizes': json.dumps(topics.get('cluster_sizes')),
+        'topics_top_terms': ' | '.join(', '.join(terms[:TOP_TERMS])
+                                       for terms in (topics.get('top_terms') or {}).values()),
+        'authors': communities.get('authors'),
+        'communities': communities.get('communities'),
+        'modularity': communities.get('modularity'),
+        'largest_community': max(community_sizes.values(), default=None),
+        'errors': '; '.join(result.get('errors', [])),
+    }
+
+
+def write_report(targets, results, output_dir=OUTPUT_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, f"comparativo_{datetime.now():%Y%m%d_%H%M%S}")
+    report = [dict(zip(['subreddit', 'query', 'limit'], target), **results[target]) for target in targets]
+    with open(f"{base}.json", 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    rows = [summary_row(target, results[target]) for target in targets]
+    with open(f"{base}.csv", 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return base, rows
+
+
+def run(targets, max_workers=MAX_WORKERS, output_dir=OUTPUT_DIR):
+    targets = list(dict.fromkeys(targets))
+    # Alvos distintos que caem no mesmo diretório (ex.: 'TCC 2' e 'TCC_2') sobrescreveriam as saídas um do outro.
+    slugs = {}
+    for target in targets:
+        anterior = slugs.setdefault(slug(*target), target)
+        if anterior != target:
+            raise ValueError(f"Os alvos {anterior} e {target} gravariam no mesmo diretório '{slug(*target)}'.")
+
+    # A coleta é feita aqui, em série: um único limitador de taxa para todas as chamadas à API. Os processos
+    # das análises só leem o cache.
+    for subreddit_name, query, limit in targets:
+        posts, comments = load_posts_with_comments(subreddit_name, query, limit)
+        print(f"Coleta de '{subreddit_name}' / '{query}': {len(posts)} posts e {len(comments)} comentários.")
+
+    results = {}
+    # Cada thread espera o processo de um alvo; no máximo max_workers processos rodam ao mesmo tempo.
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(run_isolated, target, output_dir): target for target in targets}
+        for future in as_completed(futures):
+            target = futures[future]
+            try:
+                results[target] = future.result()
+            except Exception as error:
+                results[target] = {'errors': [f"processo: {error!r}"]}
+            status = 'com erros' if results[target]['errors'] else 'ok'
+            print(f"Alvo '{target[0]}' / '{target[1]}' concluído ({status}).")
+
+    base, rows = write_report(targets, results, output_dir)
+    print(f"\n{'subreddit':>20} | {'query':>15} | {'posts':>6} | {'k kdd':>5} | {'k tópicos':>9} | "
+          f"{'comunidades':>11} | {'modularidade':>12}")
+    for row in rows:
+        modularidade = f"{row['modularity']:.3f}" if row['modularity'] is not None else '-'
+        print(f"{row['subreddit']:>20} | {row['query']:>15} | {row['posts'] or '-':>6} | {row['kdd_k'] or '-':>5} | "
+              f"{row['topics_k'] or '-':>9} | {row['communities'] or '-':>11} | {modularidade:>12}")
+    print(f"\nRelatório comparativo salvo em '{base}.json' e '{base}.csv'.")
+    return rows
+
+
+if __name__ == '__main__':
+    # Alvos como subreddit:query:limite, ou um CSV com as colunas subreddit, query e limit.
+    if len(sys.argv) == 2 and sys.argv[1].endswith('.csv'):
+        alvos = read_targets(sys.argv[1])
+    else:
+        alvos = [parse_target(alvo) for alvo in sys.argv[1:]]
+    if not alvos:
+        print("Informe os alvos como subreddit:query:limite ou um arquivo CSV (subreddit, query, limit).")
+        sys.exit(1)
+    run(alvos)
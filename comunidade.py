@@ -1,166 +1,212 @@
-import praw
-import re
-import nltk
+import os
 from collections import defaultdict
 import matplotlib.pyplot as plt
 import matplotlib.colors
-import matplotlib.cm as cm
 import networkx as nx
-import community as community_louvain
-from sklearn.feature_extraction.text import TfidfVectorizer
+from coleta import Collector, load_posts_with_comments, comments_by_post
+from corpus_autores import AuthorCorpus
+from instrumentacao import RunReport
+from interacoes import UNKNOWN_AUTHOR, interaction_edges, new_interactions, resolve_parents
+from limpeza import clean_series, load_stopwords
+from rede import (InteractionGraph, community_labels, community_stability, layout, load_state, modularity,
+                  save_state, update_partition)
+from renderizacao import show, top_nodes, wait
+from topicos import community_keywords_from_corpus
+
+
+def recent_interactions(collector, subreddit_name, search_query, since, time_filter='all'):
+    novos_posts, comentarios_recentes = collector.collect_incremental(subreddit_name, search_query, time_filter,
+                                                                      with_comments=True)
+    # Os comentários novos podem ser de posts fora dos limit_posts primeiros: os donos vêm do cache pelo id,
+    # qualquer que seja a posição.
+    donos = collector.cache.posts_by_id((subreddit_name, search_query, time_filter),
+                                        {comment['link_id'] for comment in comentarios_recentes})
+    return novos_posts, donos, comentarios_recentes, new_interactions(donos, comentarios_recentes, since)
+
+
+def main(subreddit_name='faculdadeBR', search_query='TCC', limit_posts=50):
+    portuguese_stopwords = load_stopwords()
+
+    relatorio = RunReport('comunidade')
+
+    print("--- Iniciando a Coleta de Dados Aprimorada ---")
+
+    estado_path = os.environ.get('COMUNIDADE_ESTADO')
+
+    estado_anterior = None
+    ultimo_comentario = float('-inf')
+    if estado_path and os.path.exists(estado_path):
+        estado_anterior = load_state(estado_path)
+        ultimo_comentario = estado_anterior[2].get('last_comment_utc', ultimo_comentario)
+
+    interacoes = [] 
+    novas_interacoes = []
+    corpus = AuthorCorpus(path=os.environ.get('CORPUS_AUTORES'), stopwords=portuguese_stopwords)
+
+    print(f"Coletando até {limit_posts} posts e seus comentários de '{subreddit_name}'...")
+
+    etapa = relatorio.start('coleta')
+    posts, comments = load_posts_with_comments(subreddit_name, search_query, limit_posts)
+    if estado_anterior is not None:
+        # O cache sozinho não traz nada depois de last_comment_utc: busca os posts novos e os comentários recentes.
+        novos_posts, donos, comentarios_recentes, novas_interacoes = recent_interactions(
+            Collector(), subreddit_name, search_query, ultimo_comentario)
+        vistos = {post['id'] for post in posts}
+        posts = posts + [post for post in {post['id']: post for post in novos_posts + donos}.values()
+                         if post['id'] not in vistos]
+        comments = list({comment['id']: comment for comment in comments + comentarios_recentes}.values())
+        print(f"{len(novos_posts)} posts novos e {len(comentarios_recentes)} comentários recentes desde a última execução.")
+    etapa['rows'], etapa['comments'] = len(posts), len(comments)
+    comentarios_por_post = comments_by_post(comments)
+
+    etapa = relatorio.start('interacoes')
+    # Títulos, textos e comentários são limpos de uma vez, com a limpeza vetorizada.
+    titulos = clean_series([post['title'] for post in posts]).tolist()
+    textos = clean_series([post['selftext'] for post in posts]).tolist()
+    corpos = dict(zip([comment['id'] for comment in comments], clean_series([comment['body'] for comment in comments])))
+    for post, titulo, texto in zip(posts, titulos, textos):
+        if post['author'] != UNKNOWN_AUTHOR:
+            corpus.add(post['author'], titulo)
+            corpus.add(post['author'], texto)
+
+        for comment, autor_pai in resolve_parents(post, comentarios_por_post[post['id']]):
+            autor_comentario = comment['author']
 
-try:
-    nltk.data.find('corpora/stopwords')
-except nltk.downloader.DownloadError:
-    nltk.download('stopwords')
+            if autor_comentario != autor_pai:
+                interacoes.append((autor_comentario, autor_pai))
 
-portuguese_stopwords = nltk.corpus.stopwords.words('portuguese')
-portuguese_stopwords.extend(['tcc', 'pra', 'tô', 'aqui', 'lá', 'pro', 'ser', 'ter', 'fazer', 'coisa', 'alguém', 'ainda', 'sobre', 'tudo', 'sei', 'só', 'post', 'trabalho', 'curso', 'pra', 'q', 'vc'])
+            corpus.add(autor_comentario, corpos[comment['id']])
 
-def clean_text(text):
-    if not isinstance(text, str):
-        return ""
-    text = text.lower()
-    text = re.sub(r'http\S+', '', text)
-    text = re.sub(r'[^a-zà-ú\s]', '', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    arestas = interaction_edges(interacoes)
+    etapa['rows'], etapa['edges'] = len(interacoes), len(arestas)
+    print(f"Coleta finalizada. {len(interacoes)} interações encontradas ({len(arestas)} pares distintos).")
 
-print("--- Iniciando a Coleta de Dados Aprimorada ---")
+    grafo = relatorio.start('grafo')
+    print("\n--- Construindo a Rede de Interações ---")
 
-client_id = 'SEU_CLIENT_ID'
-client_secret = 'SEU_CLIENT_SECRET'
-user_agent = 'USER_AGENT'
+    if estado_anterior is not None:
+        rede_anterior, rotulos_anteriores, _ = estado_anterior
+        print(f"Aplicando {len(novas_interacoes)} novas interações sobre a partição da execução anterior...")
+        rede, rotulos = update_partition(rede_anterior, rotulos_anteriores, interaction_edges(novas_interacoes))
 
-reddit = praw.Reddit(client_id=client_id, client_secret=client_secret, user_agent=user_agent)
+        estabilidade = community_stability(rede_anterior.names, rotulos_anteriores, rede.names, rotulos)
+        print(f"- Comunidades: {estabilidade['previous_communities']} -> {estabilidade['communities']}")
+        print(f"- Autores novos: {estabilidade['new_authors']}")
+        print(f"- Divisões: {len(estabilidade['splits'])} | Fusões: {len(estabilidade['merges'])}")
+        print(f"- Rotatividade de membros: {estabilidade['churn']:.1%}")
+    else:
+        rede = InteractionGraph.from_edges(arestas)
+        relatorio.start('louvain')
+        rotulos = community_labels(rede)
 
-subreddit_name = "faculdadeBR"
-search_query = 'TCC'
-limit_posts = 50 
+    if estado_path:
+        ultimo_comentario = max([ultimo_comentario] + [comment['created_utc'] for comment in comments])
+        save_state(estado_path, rede, rotulos, last_comment_utc=ultimo_comentario)
 
-subreddit = reddit.subreddit(subreddit_name)
+    grafo['rows'], grafo['edges'] = rede.n_nodes, rede.n_edges
+    G = rede.to_networkx()
 
-interacoes = [] 
-author_texts = defaultdict(str) 
+    print(f"Rede construída com {rede.n_nodes} nós (autores) e {rede.n_edges} arestas (interações).")
 
-print(f"Coletando até {limit_posts} posts e seus comentários de '{subreddit_name}'...")
+    # Em redes grandes, RENDER_TOP_K limita o desenho aos autores de maior grau de cada comunidade.
+    top_k = int(os.environ.get('RENDER_TOP_K', 0))
+    G_desenho = G.subgraph(rede.names[top_nodes(rede.adjacency(), rotulos, top_k)]) if top_k else G
 
-for submission in subreddit.search(search_query, limit=limit_posts):
-    if submission.author:
-        author_texts[submission.author.name] += " " + clean_text(submission.title)
-        author_texts[submission.author.name] += " " + clean_text(submission.selftext)
+    relatorio.start('layout')
+    plt.figure(figsize=(12, 12))
+    pos = layout(rede, labels=rotulos)
+    relatorio.start('renderizacao')
+    nx.draw_networkx(G_desenho, pos, with_labels=False, node_size=50, width=0.5, node_color='blue', edge_color='gray')
+    plt.title("Visualização da Rede de Interações do Subreddit")
+    show('comunidade_rede')
 
-    submission.comments.replace_more(limit=0)
-    for comment in submission.comments.list():
-        if hasattr(comment, 'author') and comment.author and hasattr(comment, 'parent') and comment.parent().author:
-            autor_comentario = comment.author.name
-            autor_pai = comment.parent().author.name
-            
-            if autor_comentario != autor_pai:
-                interacoes.append((autor_comentario, autor_pai))
-            
-            author_texts[autor_comentario] += " " + clean_text(comment.body)
+    print("\n--- Detectando e Visualizando as Comunidades na Rede ---")
 
-print(f"Coleta finalizada. {len(interacoes)} interações encontradas.")
+    particao = dict(zip(rede.names, rotulos.tolist()))
+    print(f"Detectadas {len(set(particao.values()))} comunidades.")
 
-print("\n--- Construindo a Rede de Interações ---")
+    plt.figure(figsize=(15, 15))
 
-G = nx.Graph()
-G.add_edges_from(interacoes)
+    cores_dos_nos = [particao.get(node) for node in G_desenho.nodes()]
 
-G.remove_nodes_from(list(nx.isolates(G)))
+    nx.draw_networkx(
+        G_desenho,
+        pos,
+        with_labels=False,
+        node_size=80,
+        width=0.5,
+        node_color=cores_dos_nos,
+        cmap=plt.get_cmap('viridis') 
+    )
 
-print(f"Rede construída com {G.number_of_nodes()} nós (autores) e {G.number_of_edges()} arestas (interações).")
+    plt.title("Visualização da Rede com Detecção de Comunidades (Método de Louvain)")
+    show('comunidade_louvain')
 
-plt.figure(figsize=(12, 12))
-pos = nx.spring_layout(G, k=0.15, iterations=20)
-nx.draw_networkx(G, pos, with_labels=False, node_size=50, width=0.5, node_color='blue', edge_color='gray')
-plt.title("Visualização da Rede de Interações do Subreddit")
-plt.show()
+    print("\n--- Detectando e Caracterizando as Comunidades na Rede ---")
 
-print("\n--- Detectando e Visualizando as Comunidades na Rede ---")
+    comunidades = defaultdict(list)
+    for autor, id_comunidade in particao.items():
+        comunidades[id_comunidade].append(autor)
 
-particao = community_louvain.best_partition(G)
-print(f"Detectadas {len(set(particao.values()))} comunidades.")
+    print(f"Detectadas {len(comunidades)} comunidades.")
 
-plt.figure(figsize=(15, 15))
-pos = nx.spring_layout(G, k=0.15, iterations=20)
+    num_comunidades = len(comunidades)
+    paleta = plt.get_cmap('viridis', num_comunidades)
 
-cores_dos_nos = [particao.get(node) for node in G.nodes()]
+    cores_hex_por_comunidade = {}
+    for i in range(num_comunidades):
+        cor_rgba = paleta(i) 
+        cores_hex_por_comunidade[i] = matplotlib.colors.to_hex(cor_rgba) 
 
-nx.draw_networkx(
-    G,
-    pos,
-    with_labels=False,
-    node_size=80,
-    width=0.5,
-    node_color=cores_dos_nos,
-    cmap=plt.cm.get_cmap('viridis') 
-)
+    for id_comunidade, membros in sorted(comunidades.items()):
+        print(f"\n--- Comunidade {id_comunidade} ---")
+        print(f"- Cor no Grafo (Hex): {cores_hex_por_comunidade.get(id_comunidade)}")
+        print(f"- Total de Membros: {len(membros)}")
 
-plt.title("Visualização da Rede com Detecção de Comunidades (Método de Louvain)")
-plt.show()
+        limite_membros_para_mostrar = 10 
 
-print("\n--- Detectando e Caracterizando as Comunidades na Rede ---")
+        if len(membros) > limite_membros_para_mostrar:
+            print(f"- Amostra de {limite_membros_para_mostrar} membros: {membros[:limite_membros_para_mostrar]}")
+        else:
+            print(f"- Membros: {membros}")
 
-particao = community_louvain.best_partition(G)
+    relatorio.start('topicos')
+    print("\n--- Caracterizando Tópicos por Comunidade ---")
 
-comunidades = defaultdict(list)
-for autor, id_comunidade in particao.items():
-    comunidades[id_comunidade].append(autor)
+    comprimentos = corpus.text_lengths()
+    membros_com_texto = {
+        id_comunidade: [autor for autor in membros if comprimentos.get(autor, 0) > 0]
+        for id_comunidade, membros in comunidades.items()
+    }
+    termos_chave = community_keywords_from_corpus(corpus, membros_com_texto)
 
-print(f"Detectadas {len(comunidades)} comunidades.")
+    for id_comunidade, membros in sorted(comunidades.items()):
+        print(f"\n--- ANÁLISE DA COMUNIDADE {id_comunidade} ---")
 
-num_comunidades = len(comunidades)
-paleta = cm.get_cmap('viridis', num_comunidades)
+        print(f"- Total de Membros na Estrutura da Rede: {len(membros)}")
+        print(f"- Membros com Texto para Análise: {len(membros_com_texto[id_comunidade])}")
 
-cores_hex_por_comunidade = {}
-for i in range(num_comunidades):
-    cor_rgba = paleta(i) 
-    cores_hex_por_comunidade[i] = matplotlib.colors.to_hex(cor_rgba) 
+        if id_comunidade not in termos_chave.index:
+            print("- Texto insuficiente para análise temática nesta comunidade.")
+        else:
+            print("- Termos-Chave da Comunidade:")
+            print(f"    {', '.join(termos_chave.loc[id_comunidade, 'keywords'])}")
 
-for id_comunidade, membros in sorted(comunidades.items()):
-    print(f"\n--- Comunidade {id_comunidade} ---")
-    print(f"- Cor no Grafo (Hex): {cores_hex_por_comunidade.get(id_comunidade)}")
-    print(f"- Total de Membros: {len(membros)}")
-    
-    limite_membros_para_mostrar = 10 
-    
-    if len(membros) > limite_membros_para_mostrar:
-        print(f"- Amostra de {limite_membros_para_mostrar} membros: {membros[:limite_membros_para_mostrar]}")
-    else:
-        print(f"- Membros: {membros}")
-        
-print("\n--- Caracterizando Tópicos por Comunidade ---")
-
-for id_comunidade, membros in sorted(comunidades.items()):
-    print(f"\n--- ANÁLISE DA COMUNIDADE {id_comunidade} ---")
-    
-    membros_com_texto = [autor for autor in membros if autor in author_texts and len(author_texts[autor].strip()) > 0]
-    
-    print(f"- Total de Membros na Estrutura da Rede: {len(membros)}")
-    print(f"- Membros com Texto para Análise: {len(membros_com_texto)}")
-    
-    texto_comunidade = " ".join([author_texts[autor] for autor in membros_com_texto])
-    
-    if len(texto_comunidade.strip()) < 100:
-        print("- Texto insuficiente para análise temática nesta comunidade.")
-        continue
-
-    vectorizer = TfidfVectorizer(
-        stop_words=portuguese_stopwords,
-        max_features=100,
-        ngram_range=(1, 2)
-    )
-    try:
-        tfidf_matrix_comunidade = vectorizer.fit_transform([texto_comunidade])
-    
-        feature_scores = dict(zip(vectorizer.get_feature_names_out(), tfidf_matrix_comunidade.toarray()[0]))
-        termos_chave = sorted(feature_scores, key=feature_scores.get, reverse=True)
-        
-        print("- Termos-Chave da Comunidade:")
-        print(f"    {', '.join(termos_chave[:15])}")
-    except ValueError:
-        print("- Não foi possível vetorizar o texto (corpus muito pequeno ou sem features).")
-
-print("\n--- Fim da Análise de Redes Sociais ---")
\ No newline at end of file
+    relatorio.start('renderizacao_final')
+    wait()
+    relatorio.finish()
+
+    print("\n--- Fim da Análise de Redes Sociais ---")
+    return {
+        'authors': rede.n_nodes,
+        'interactions': len(interacoes),
+        'communities': len(comunidades),
+        'modularity': modularity(rede.adjacency(), rotulos),
+        'community_sizes': {id_comunidade: len(membros) for id_comunidade, membros in sorted(comunidades.items())},
+        'top_terms': {id_comunidade: list(termos_chave.loc[id_comunidade, 'keywords'])
+                      for id_comunidade in termos_chave.index},
+    }
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+import sqlite3
+from collections import Counter, defaultdict
+from contextlib import closing
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+FLUSH_EVERY = 50_000
+
+
+class AuthorCorpus:
+    def __init__(self, path=None, stopwords=None, ngram_range=(1, 2), flush_every=FLUSH_EVERY, reset=True,
+                 keep_texts=False):
+        # Os trechos brutos só são guardados com keep_texts; as palavras-chave usam apenas as contagens.
+        self.path = path
+        self.keep_texts = keep_texts
+        self.analyzer = CountVectorizer(stop_words=stopwords, ngram_range=ngram_range).build_analyzer()
+        self.flush_every = flush_every
+        self.chunks = defaultdict(list)
+        self.counts = defaultdict(Counter)
+        self.lengths = Counter()
+        self.pending = 0
+
+        if path:
+            with closing(self.connect()) as conn, conn:
+                if reset:
+                    conn.executescript("DROP TABLE IF EXISTS chunks; DROP TABLE IF EXISTS term_counts; "
+                                       "DROP TABLE IF EXISTS lengths;")
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS chunks (author TEXT, text TEXT);
+                    CREATE INDEX IF NOT EXISTS chunks_author ON chunks (author);
+                    CREATE TABLE IF NOT EXISTS term_counts (
+                        author TEXT, term TEXT, count INTEGER, PRIMARY KEY (author, term)
+                    );
+                    CREATE TABLE IF NOT EXISTS lengths (author TEXT PRIMARY KEY, length INTEGER);
+                """)
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=60)
+
+    def add(self, author, text):
+        if not text:
+            return
+        if self.keep_texts:
+            self.chunks[author].append(text)
+        self.counts[author].update(self.analyzer(text))
+        # Comprimento do texto do autor como se os trechos fossem unidos por espaço.
+        self.lengths[author] += len(text) + (1 if self.lengths[author] else 0)
+        self.pending += 1
+        if self.path and self.pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self.path or not self.pending:
+            return
+        with closing(self.connect()) as conn, conn:
+            conn.executemany("INSERT INTO chunks VALUES (?, ?)",
+                             [(author, text) for author, texts in self.chunks.items() for text in texts])
+            conn.executemany(
+                "INSERT INTO term_counts VALUES (?, ?, ?) "
+                "ON CONFLICT (author, term) DO UPDATE SET count = count + excluded.count",
+                [(author, term, count) for author, counts in self.counts.items() for term, count in counts.items()]
+            )
+            conn.executemany(
+                "INSERT INTO lengths VALUES (?, ?) "
+                "ON CONFLICT (author) DO UPDATE SET length = length + 1 + excluded.length",
+                list(self.lengths.items())
+            )
+        self.chunks.clear()
+        self.counts.clear()
+        self.lengths.clear()
+        self.pending = 0
+
+    def text_lengths(self):
+        if not self.path:
+            return dict(self.lengths)
+        self.flush()
+        with closing(self.connect()) as conn:
+            return dict(conn.execute("SELECT author, length FROM lengths"))
+
+    def texts(self, author):
+        if not self.keep_texts:
+            raise ValueError("Os textos brutos só são guardados com keep_texts=True.")
+        if not self.path:
+            yield from self.chunks.get(author, [])
+            return
+        self.flush()
+        with closing(self.connect()) as conn:
+            for text, in conn.execute("SELECT text FROM chunks WHERE author = ? ORDER BY rowid", (author,)):
+                yield text
+
+    def term_counts(self, author):
+        if not self.path:
+            return Counter(self.counts.get(author, {}))
+        self.flush()
+        with closing(self.connect()) as conn:
+            return Counter(dict(conn.execute("SELECT term, count FROM term_counts WHERE author = ?", (author,))))
+
+    def _grouped_counts(self, membership):
+        if not self.path:
+            for community, members in membership.items():
+                counts = Counter()
+                for author in members:
+                    counts.update(self.counts.get(author, {}))
+                for term, count in counts.items():
+                    yield community, term, count
+            return
+
+        self.flush()
+        with closing(self.connect()) as conn:
+            conn.execute("CREATE TEMP TABLE membership (author TEXT PRIMARY KEY, community INTEGER)")
+            conn.executemany("INSERT INTO membership VALUES (?, ?)",
+                             [(author, community) for community, members in membership.items() for author in members])
+            yield from conn.execute("""
+                SELECT m.community, t.term, SUM(t.count)
+                FROM term_counts t JOIN membership m ON m.author = t.author
+                GROUP BY m.community, t.term
+            """)
+
+    def community_counts(self, membership):
+        communities = list(membership)
+        row_of = {community: row for row, community in enumerate(communities)}
+        terms = {}
+        rows, cols, data = [], [], []
+        for community, term, count in self._grouped_counts(membership):
+            rows.append(row_of[community])
+            cols.append(terms.setdefault(term, len(terms)))
+            data.append(count)
+
+        # Vocabulário em ordem alfabética, como no CountVectorizer, para desempates estáveis.
+        names = np.asarray(list(terms), dtype=object)
+        order = np.argsort(names.astype(str), kind='stable')
+        position = np.empty(len(order), dtype=np.int64)
+        position[order] = np.arange(len(order))
+        counts = sparse.csr_matrix((np.asarray(data, dtype=float), (rows, position[np.asarray(cols, dtype=np.int64)])),
+                                   shape=(len(communities), len(terms)))
+        return counts, names[order], communities
@@ -0,0 +1,93 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from sklearn.feature_extraction.text import HashingVectorizer
+
+SHINGLE_SIZE = 3
+N_HASHES = 128
+N_BANDS = 16
+THRESHOLD = 0.8
+BLOCK_SIZE = 2_000_000
+PRIME = 2 ** 31 - 1
+
+
+def shingle_sets(texts, shingle_size=SHINGLE_SIZE):
+    # Cada shingle (sequência de palavras) vira um id de 30 bits; a matriz CSR guarda o conjunto por texto.
+    vectorizer = HashingVectorizer(ngram_range=(shingle_size, shingle_size), n_features=2 ** 30,
+                                   alternate_sign=False, norm=None, binary=True, lowercase=False)
+    return vectorizer.transform(texts).tocsr()
+
+
+def minhash_signatures(shingles, n_hashes=N_HASHES, random_state=42, block_size=BLOCK_SIZE):
+    rng = np.random.default_rng(random_state)
+    a = rng.integers(1, PRIME, n_hashes, dtype=np.uint64)
+    b = rng.integers(0, PRIME, n_hashes, dtype=np.uint64)
+
+    n = shingles.shape[0]
+    signatures = np.full((n, n_hashes), PRIME, dtype=np.uint32)
+    lengths = np.diff(shingles.indptr)
+    rows = np.flatnonzero(lengths)
+
+    # Blocos de linhas com no máximo block_size valores de hash por vez.
+    budget = max(1, block_size // n_hashes)
+    cumulative = np.cumsum(lengths[rows])
+    start = 0
+    while start < len(rows):
+        base = cumulative[start] - lengths[rows[start]]
+        end = max(start + 1, int(np.searchsorted(cumulative, base + budget, side='right')))
+        block = rows[start:end]
+        lo, hi = shingles.indptr[block[0]], shingles.indptr[block[-1] + 1]
+        values = shingles.indices[lo:hi].astype(np.uint64)
+        hashes = (values[:, None] * a + b) % PRIME
+        offsets = shingles.indptr[block] - lo
+        signatures[block] = np.minimum.reduceat(hashes, offsets, axis=0)
+        start = end
+    return signatures, lengths > 0
+
+
+def near_duplicate_groups(signatures, valid=None, n_bands=N_BANDS, threshold=THRESHOLD):
+    n, n_hashes = signatures.shape
+    rows_per_band = n_hashes // n_bands
+    if valid is None:
+        valid = np.ones(n, dtype=bool)
+    candidates = np.flatnonzero(valid)
+
+    sources, targets = [], []
+    for band in range(n_bands):
+        block = np.ascontiguousarray(signatures[candidates, band * rows_per_band:(band + 1) * rows_per_band])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows_per_band))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        # Cada texto do balde é ligado ao primeiro texto do mesmo balde (estrela), não a todos os pares.
+        representative = candidates[first[inverse]]
+        linked = representative != candidates
+        sources.append(candidates[linked])
+        targets.append(representative[linked])
+
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+    pairs = np.unique(np.column_stack([sources, targets]), axis=0) if len(sources) else np.empty((0, 2), int)
+    similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+    pairs = pairs[similarity >= threshold]
+
+    graph = sparse.coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    return csgraph.connected_components(graph, directed=False)[1]
+
+
+def exact_groups(texts, groups, valid):
+    # Textos curtos demais para formar um shingle ficam fora do MinHash: agrupados pelo texto normalizado.
+    short = np.flatnonzero(~valid)
+    if len(short):
+        keys = np.array([' '.join(str(texts[i]).split()) for i in short], dtype=object)
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        groups[short] = groups[short[first[inverse]]]
+    return groups
+
+
+def deduplicate(texts, threshold=THRESHOLD, shingle_size=SHINGLE_SIZE, n_hashes=N_HASHES, n_bands=N_BANDS,
+                random_state=42):
+    signatures, valid = minhash_signatures(shingle_sets(texts, shingle_size), n_hashes, random_state)
+    groups = near_duplicate_groups(signatures, valid, n_bands, threshold)
+    groups = exact_groups(np.asarray(texts, dtype=object), groups, valid)
+    _, representatives, inverse, weights = np.unique(groups, return_index=True, return_inverse=True,
+                                                     return_counts=True)
+    # representatives: primeiro texto de cada grupo; inverse: grupo de cada texto; weights: tamanho do grupo.
+    return representatives, inverse, weights
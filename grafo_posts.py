@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import networkx as nx
+from scipy import sparse
+
+
+def group_codes(values, tolerance=None):
+    values = pd.Series(values)
+    if tolerance:
+        values = np.floor(pd.to_numeric(values, errors='coerce') / tolerance)
+    codes, _ = pd.factorize(values, use_na_sentinel=True)
+    return codes
+
+
+def group_members(codes):
+    codes = np.asarray(codes)
+    valid = np.flatnonzero(codes >= 0)
+    order = valid[np.argsort(codes[valid], kind='stable')]
+    sorted_codes = codes[order]
+    boundaries = np.flatnonzero(np.diff(sorted_codes)) + 1
+    groups = np.split(order, boundaries)
+    return [g for g in groups if len(g) > 1]
+
+
+def edge_array(groups):
+    if not groups:
+        return np.empty((2, 0), dtype=np.int64)
+
+    sources = []
+    targets = []
+    for members in groups:
+        i, j = np.triu_indices(len(members), k=1)
+        sources.append(members[i])
+        targets.append(members[j])
+    return np.vstack([np.concatenate(sources), np.concatenate(targets)])
+
+
+def attribute_edges(df, column, tolerance=None):
+    return edge_array(group_members(group_codes(df[column].to_numpy(), tolerance)))
+
+
+def sparse_adjacency(df, column, tolerance=None):
+    n = len(df)
+    rows, cols = attribute_edges(df, column, tolerance)
+    data = np.ones(2 * len(rows), dtype=np.int8)
+    adjacency = sparse.coo_matrix(
+        (data, (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+        shape=(n, n)
+    )
+    return adjacency.tocsr()
+
+
+def build_attribute_graph(df, column, tolerance=None, node_attributes=('title', 'score', 'num_comments'),
+                          as_sparse=False):
+    if as_sparse:
+        return sparse_adjacency(df, column, tolerance)
+
+    G = nx.Graph()
+    attributes = [c for c in node_attributes if c in df.columns]
+    records = df[attributes].to_dict('records')
+    G.add_nodes_from(enumerate(records))
+
+    rows, cols = attribute_edges(df, column, tolerance)
+    G.add_edges_from(zip(rows.tolist(), cols.tolist()))
+    return G
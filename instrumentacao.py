@@ -0,0 +1,142 @@
+import atexit
+import cProfile
+import csv
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from coleta import request_count
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Com RUN_REPORT_DIR definido, cada execução grava um relatório JSON e CSV por etapa;
+# com PROFILE_DIR, também um dump do cProfile por etapa.
+REPORT_DIR = os.environ.get('RUN_REPORT_DIR')
+PROFILE_DIR = os.environ.get('PROFILE_DIR')
+RSS_INTERVAL = 0.05
+
+
+def cpu_time():
+    # Inclui os processos filhos já encerrados (pools de limpeza e de renderização).
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def peak_rss_mb():
+    # Pico do processo desde o início (não diminui): só serve como pico de uma etapa se ela for a primeira.
+    if resource is None:
+        return None
+    # ru_maxrss vem em KB no Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+class RssSampler:
+    # Amostra a memória residente atual em uma thread enquanto a etapa roda. Picos mais curtos que o
+    # intervalo escapam da amostragem, mas se o pico do processo subiu durante a etapa ele é dela.
+    # Sem /proc (fora do Linux) o pico por etapa fica None.
+    def __init__(self, interval=RSS_INTERVAL):
+        self.peak = current_rss_mb()
+        self.process_peak = peak_rss_mb()
+        self._done = threading.Event()
+        self._thread = None
+        if self.peak is not None:
+            self._thread = threading.Thread(target=self._sample, args=(interval,), daemon=True)
+            self._thread.start()
+
+    def _sample(self, interval):
+        while not self._done.wait(interval):
+            self.peak = max(self.peak, current_rss_mb() or 0)
+
+    def stop(self):
+        self._done.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.peak = max(self.peak, current_rss_mb() or 0)
+            process_peak = peak_rss_mb()
+            if process_peak is not None and process_peak > self.process_peak:
+                self.peak = max(self.peak, process_peak)
+        return self.peak
+
+
+class RunReport:
+    def __init__(self, name, report_dir=REPORT_DIR, profile_dir=PROFILE_DIR):
+        self.name = name
+        self.report_dir = report_dir
+        self.profile_dir = profile_dir
+        self.started_at = datetime.now()
+        self.stages = []
+        self.current = None
+        self.saved = False
+        atexit.register(self.finish)
+
+    def start(self, stage):
+        self.stop()
+        self.current = {
+            'stage': stage,
+            '_wall': time.perf_counter(),
+            '_cpu': cpu_time(),
+            '_requests': request_count(),
+            '_rss': RssSampler(),
+            '_profiler': cProfile.Profile() if self.profile_dir else None,
+        }
+        if self.current['_profiler'] is not None:
+            self.current['_profiler'].enable()
+        return self.current
+
+    def stop(self):
+        record, self.current = self.current, None
+        if record is None:
+            return
+
+        profiler = record.pop('_profiler')
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.profile_dir, f"{self.name}_{record['stage']}.prof"))
+
+        record['wall_s'] = time.perf_counter() - record.pop('_wall')
+        record['cpu_s'] = cpu_time() - record.pop('_cpu')
+        record['peak_rss_mb'] = record.pop('_rss').stop()
+        record['process_peak_rss_mb'] = peak_rss_mb()
+        record['api_requests'] = request_count() - record.pop('_requests')
+        self.stages.append(record)
+
+    def finish(self):
+        self.stop()
+        if self.saved or not self.report_dir:
+            return None
+        self.saved = True
+
+        os.makedirs(self.report_dir, exist_ok=True)
+        base = os.path.join(self.report_dir, f"{self.name}_{self.started_at:%Y%m%d_%H%M%S}")
+        report = {
+            'script': self.name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_s': sum(record['wall_s'] for record in self.stages),
+            'peak_rss_mb': peak_rss_mb(),
+            'stages': self.stages,
+        }
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        columns = ['stage', 'wall_s', 'cpu_s', 'peak_rss_mb', 'process_peak_rss_mb', 'api_requests']
+        columns += sorted({key for record in self.stages for key in record} - set(columns))
+        with open(f"{base}.csv", 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(self.stages)
+        return base
@@ -0,0 +1,57 @@
+from collections import Counter, defaultdict
+
+UNKNOWN_AUTHOR = 'Unknown'
+
+
+def author_name(thing):
+    author = getattr(thing, 'author', None)
+    return author.name if author else None
+
+
+def flatten_submission(submission):
+    submission.comments.replace_more(limit=0)
+    post = {
+        'id': submission.id,
+        'author': author_name(submission),
+        'title': submission.title,
+        'selftext': submission.selftext,
+        'created_utc': submission.created_utc
+    }
+    comments = [{
+        'id': comment.id,
+        'link_id': submission.id,
+        'parent_id': comment.parent_id,
+        'author': author_name(comment),
+        'body': comment.body,
+        'created_utc': comment.created_utc
+    } for comment in submission.comments.list()]
+    return post, comments
+
+
+def author_index(post, comments):
+    autor_post = post['author'] if post['author'] != UNKNOWN_AUTHOR else None
+    index = {'t3_' + post['id']: autor_post}
+    index.update(('t1_' + comment['id'], comment['author']) for comment in comments)
+    return index
+
+
+def resolve_parents(post, comments):
+    index = author_index(post, comments)
+    for comment in comments:
+        autor_pai = index.get(comment['parent_id'])
+        if comment['author'] and autor_pai:
+            yield comment, autor_pai
+
+
+def interaction_edges(pairs):
+    return [(autor, autor_pai, peso) for (autor, autor_pai), peso in Counter(pairs).items()]
+
+
+def new_interactions(posts, comments, since):
+    # Respostas entre autores diferentes criadas depois de since; cada comentário é resolvido no post dono.
+    por_post = defaultdict(list)
+    for comment in comments:
+        por_post[comment['link_id']].append(comment)
+    return [(comment['author'], autor_pai)
+            for post in posts for comment, autor_pai in resolve_parents(post, por_post[post['id']])
+            if comment['author'] != autor_pai and comment['created_utc'] > since]
@@ -0,0 +1,251 @@
+import json
+import os
+from collections import Counter
+from datetime import datetime, timezone
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from coleta import comments_by_post, load_posts_with_comments
+from instrumentacao import RunReport
+from interacoes import UNKNOWN_AUTHOR, resolve_parents
+from limpeza import clean_series, load_stopwords
+from rede import InteractionGraph, community_stability, louvain, modularity
+from renderizacao import show, wait
+from topicos import keywords_from_counts
+
+DAY = 24 * 3600
+WINDOWS = {'day': DAY, 'week': 7 * DAY}
+TOP_N = 10
+OUTPUT_DIR = os.environ.get('JANELAS_DIR', 'janelas')
+
+
+def interaction_events(posts, comments):
+    # Uma linha por resposta entre autores diferentes, no instante do comentário.
+    por_post = comments_by_post(comments)
+    rows = [(comment['created_utc'], comment['author'], autor_pai)
+            for post in posts for comment, autor_pai in resolve_parents(post, por_post[post['id']])
+            if comment['author'] != autor_pai]
+    events = pd.DataFrame(rows, columns=['created_utc', 'autor', 'autor_pai'])
+    return events.sort_values('created_utc', kind='stable', ignore_index=True)
+
+
+def text_events(posts, comments):
+    rows = [(post['created_utc'], post['author'], f"{post['title']} {post['selftext']}")
+            for post in posts if post['author'] != UNKNOWN_AUTHOR]
+    rows += [(comment['created_utc'], comment['author'], comment['body']) for comment in comments if comment['author']]
+    texts = pd.DataFrame(rows, columns=['created_utc', 'autor', 'texto'])
+    texts['texto'] = clean_series(texts['texto'])
+    return texts.sort_values('created_utc', kind='stable', ignore_index=True)
+
+
+class SlidingGraph:
+    # Arestas entram e saem conforme a janela avança; pesos e graus são mantidos sem reconstruir o grafo.
+    def __init__(self):
+        self.index = {}
+        self.names = []
+        self.weights = Counter()
+        self.degrees = Counter()
+
+    def _key(self, autor, autor_pai):
+        for author in (autor, autor_pai):
+            if author not in self.index:
+                self.index[author] = len(self.names)
+                self.names.append(author)
+        u, v = self.index[autor], self.index[autor_pai]
+        return (u, v) if u < v else (v, u)
+
+    def add(self, pairs):
+        for pair in pairs:
+            key = self._key(*pair)
+            self.weights[key] += 1
+            if self.weights[key] == 1:
+                self.degrees.update(key)
+
+    def remove(self, pairs):
+        for pair in pairs:
+            key = self._key(*pair)
+            self.weights[key] -= 1
+            if self.weights[key] == 0:
+                del self.weights[key]
+                self.degrees.subtract(key)
+                for node in key:
+                    if not self.degrees[node]:
+                        del self.degrees[node]
+
+    def degree_distribution(self):
+        # Posição i: número de autores com i vizinhos distintos na janela.
+        return np.bincount(np.fromiter(self.degrees.values(), dtype=np.int64, count=len(self.degrees)))
+
+    def snapshot(self):
+        keys = np.fromiter((node for key in self.weights for node in key), dtype=np.int64,
+                           count=2 * len(self.weights)).reshape(-1, 2)
+        weights = np.fromiter(self.weights.values(), dtype=float, count=len(self.weights))
+        nodes, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.reshape(-1, 2)
+        return InteractionGraph(np.asarray(self.names, dtype=object)[nodes], inverse[:, 0], inverse[:, 1], weights)
+
+
+def seeded_partition(graph, previous, resolution=1.0, random_state=42):
+    # A partição da janela anterior é o ponto de partida; autores novos começam como comunidades unitárias.
+    initial = np.array(pd.Series(previous).reindex(graph.names), dtype=float)
+    novos = np.isnan(initial)
+    initial[novos] = np.nanmax(initial, initial=-1) + 1 + np.arange(novos.sum())
+    return louvain(graph.adjacency(), resolution, random_state, partition=initial.astype(np.int64))
+
+
+def match_labels(previous, names, labels, next_id):
+    # Cada comunidade herda o id da comunidade anterior com quem mais divide autores (se ainda livre);
+    # as demais recebem ids novos. Assim o mesmo id acompanha a comunidade entre janelas.
+    current = pd.Series(labels, index=pd.Index(names))
+    overlap = pd.crosstab(current, pd.Series(previous).reindex(current.index)).stack()
+    mapping, taken = {}, set()
+    for (new, old), count in overlap[overlap > 0].sort_values(ascending=False, kind='stable').items():
+        if new not in mapping and old not in taken:
+            mapping[new] = int(old)
+            taken.add(old)
+    for new in np.unique(labels):
+        if new not in mapping:
+            mapping[new] = next_id
+            next_id += 1
+    return current.map(mapping).to_numpy(), next_id
+
+
+def window_keywords(counts, authors, partition, terms, top_n=TOP_N):
+    community = pd.Series(authors).map(partition)
+    rows = np.flatnonzero(community.notna().to_numpy())
+    codes, communities = pd.factorize(community.iloc[rows].astype(np.int64))
+    indicator = sparse.csr_matrix((np.ones(len(rows)), (codes, rows)), shape=(len(communities), len(authors)))
+    counts = indicator @ counts
+    with_terms = np.flatnonzero(counts.getnnz(axis=1))
+    return keywords_from_counts(counts[with_terms], terms, communities[with_terms], top_n)
+
+
+def sliding_windows(posts, comments, width=WINDOWS['week'], stride=None, stopwords=None, resolution=1.0,
+                    random_state=42, top_n=TOP_N):
+    stride = stride or width
+    events = interaction_events(posts, comments)
+    texts = text_events(posts, comments)
+    if events.empty:
+        return
+
+    # O texto é vetorizado uma vez; cada janela soma só as linhas (contíguas, pela ordem no tempo) dos seus textos.
+    vectorizer = CountVectorizer(stop_words=stopwords, ngram_range=(1, 2))
+    text_counts = vectorizer.fit_transform(texts['texto']).tocsr()
+    terms = vectorizer.get_feature_names_out()
+
+    event_times = events['created_utc'].to_numpy()
+    text_times = texts['created_utc'].to_numpy()
+    post_times = np.sort([post['created_utc'] for post in posts])
+    pairs = list(zip(events['autor'], events['autor_pai']))
+
+    grafo = SlidingGraph()
+    previous, next_id = pd.Series(dtype=np.int64), 0
+    lo = hi = 0
+    # Janelas alinhadas à meia-noite (UTC) do primeiro dia com interações.
+    for start in np.arange(event_times[0] // DAY * DAY, event_times[-1] + 1, stride):
+        end = start + width
+        new_lo, new_hi = np.searchsorted(event_times, [start, end])
+        grafo.remove(pairs[lo:min(hi, new_lo)])
+        grafo.add(pairs[max(hi, new_lo):new_hi])
+        lo, hi = new_lo, new_hi
+
+        window = {
+            'start': datetime.fromtimestamp(start, timezone.utc).isoformat(timespec='seconds'),
+            'end': datetime.fromtimestamp(end, timezone.utc).isoformat(timespec='seconds'),
+            'posts': int(np.searchsorted(post_times, end) - np.searchsorted(post_times, start)),
+            'interactions': int(hi - lo),
+        }
+        graph = grafo.snapshot()
+        window['authors'], window['edges'] = graph.n_nodes, graph.n_edges
+        if graph.n_nodes == 0:
+            window.update(communities=0, modularity=0.0, degree_distribution=[], community_sizes={}, keywords={})
+            yield window
+            continue
+
+        labels = seeded_partition(graph, previous, resolution, random_state)
+        labels, next_id = match_labels(previous, graph.names, labels, next_id)
+        partition = pd.Series(labels, index=pd.Index(graph.names))
+
+        text_lo, text_hi = np.searchsorted(text_times, [start, end])
+        keywords = window_keywords(text_counts[text_lo:text_hi], texts['autor'].to_numpy()[text_lo:text_hi],
+                                   partition, terms, top_n)
+        window.update(
+            communities=int(partition.nunique()),
+            modularity=modularity(graph.adjacency(), labels),
+            degree_distribution=grafo.degree_distribution().tolist(),
+            community_sizes={int(c): int(n) for c, n in partition.value_counts().sort_index().items()},
+            keywords={int(c): list(words) for c, words in keywords['keywords'].items()},
+        )
+        if len(previous):
+            window['stability'] = community_stability(previous.index, previous.to_numpy(), graph.names, labels)
+        previous = partition
+        yield window
+
+
+def main(subreddit_name='faculdadeBR', search_query='TCC', limit_posts=150, window='week', stride_days=None):
+    relatorio = RunReport('janelas')
+    width = WINDOWS[window]
+    stride = stride_days * DAY if stride_days else width
+
+    etapa = relatorio.start('coleta')
+    print(f"Coletando até {limit_posts} posts e seus comentários de '{subreddit_name}' com a query '{search_query}'...")
+    posts, comments = load_posts_with_comments(subreddit_name, search_query, limit_posts)
+    etapa['rows'], etapa['comments'] = len(posts), len(comments)
+
+    etapa = relatorio.start('janelas')
+    print(f"\n--- Rede de interações em janelas de 1 {'dia' if window == 'day' else 'semana'} "
+          f"(passo de {stride / DAY:g} dia(s)) ---")
+    janelas = []
+    for janela in sliding_windows(posts, comments, width, stride, stopwords=load_stopwords()):
+        janelas.append(janela)
+        graus = janela['degree_distribution']
+        grau_medio = np.average(np.arange(len(graus)), weights=graus) if sum(graus) else 0
+        print(f"\n{janela['start'][:10]} a {janela['end'][:10]}: {janela['posts']} posts, "
+              f"{janela['interactions']} interações, {janela['authors']} autores, "
+              f"{janela['communities']} comunidades (modularidade {janela['modularity']:.3f}, "
+              f"grau médio {grau_medio:.2f})")
+        if 'stability' in janela:
+            estabilidade = janela['stability']
+            print(f"  Autores novos: {estabilidade['new_authors']} | Divisões: {len(estabilidade['splits'])} | "
+                  f"Fusões: {len(estabilidade['merges'])} | Rotatividade: {estabilidade['churn']:.1%}")
+        maiores = sorted(janela['community_sizes'].items(), key=lambda item: -item[1])[:3]
+        for id_comunidade, tamanho in maiores:
+            termos = ', '.join(janela['keywords'].get(id_comunidade, [])[:5]) or '-'
+            print(f"  Comunidade {id_comunidade} ({tamanho} autores): {termos}")
+    etapa['rows'] = len(janelas)
+
+    if not janelas:
+        print("Nenhuma interação encontrada para montar as janelas.")
+        return []
+
+    relatorio.start('renderizacao')
+    inicio = pd.to_datetime([janela['start'] for janela in janelas])
+    fig, (eixo_comunidades, eixo_modularidade) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
+    eixo_comunidades.plot(inicio, [janela['communities'] for janela in janelas], marker='o', label='Comunidades')
+    eixo_comunidades.plot(inicio, [janela['authors'] for janela in janelas], marker='.', label='Autores')
+    eixo_comunidades.legend()
+    eixo_comunidades.set_title('Evolução da Rede de Interações por Janela de Tempo')
+    eixo_modularidade.plot(inicio, [janela['modularity'] for janela in janelas], marker='o', color='purple')
+    eixo_modularidade.set_ylabel('Modularidade')
+    eixo_modularidade.set_xlabel('Início da janela')
+    plt.tight_layout()
+    show('janelas_evolucao')
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    caminho = os.path.join(OUTPUT_DIR, f"janelas_{subreddit_name}_{window}_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({'subreddit': subreddit_name, 'query': search_query, 'window': window,
+                   'stride_days': stride / DAY, 'windows': janelas}, f, ensure_ascii=False, indent=2)
+    print(f"\nJanelas salvas em '{caminho}'.")
+
+    wait()
+    relatorio.finish()
+    return janelas
+
+
+if __name__ == '__main__':
+    main(window=os.environ.get('JANELAS_TAMANHO', 'week'), stride_days=float(os.environ.get('JANELAS_PASSO', 0)))
@@ -0,0 +1,41 @@
+import os
+import re
+
+import pandas as pd
+
+URL_PATTERN = re.compile(r'http\S+')
+NON_LETTER_PATTERN = re.compile(r'[^a-zà-ú\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+CUSTOM_STOPWORDS = ['tcc', 'pra', 'tô', 'aqui', 'lá', 'pro', 'ser', 'ter', 'fazer', 'coisa', 'alguém', 'ainda', 'sobre',
+                    'tudo', 'sei', 'só', 'post', 'trabalho', 'curso', 'q', 'vc']
+
+# Lista de stopwords do português do NLTK, distribuída com o projeto para não depender de download.
+STOPWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stopwords_pt.txt')
+
+
+def load_stopwords(path=STOPWORDS_PATH):
+    with open(path, encoding='utf-8') as f:
+        stopwords = [line.strip() for line in f if line.strip()]
+    return stopwords + [word for word in CUSTOM_STOPWORDS if word not in stopwords]
+
+
+def clean_text(text):
+    if not isinstance(text, str):
+        return ""
+    text = text.lower()
+    text = URL_PATTERN.sub('', text)
+    text = NON_LETTER_PATTERN.sub('', text)
+    text = WHITESPACE_PATTERN.sub(' ', text).strip()
+    return text
+
+
+def clean_series(texts):
+    texts = pd.Series(texts, dtype=object)
+    texts = texts.where(texts.map(lambda text: isinstance(text, str)), '')
+    return (texts.str.lower()
+            .str.replace(URL_PATTERN, '', regex=True)
+            .str.replace(NON_LETTER_PATTERN, '', regex=True)
+            .str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+            .str.strip())
+
@@ -0,0 +1,129 @@
+import numpy as np
+from scipy import sparse, stats
+from sklearn.metrics import silhouette_score
+
+EXACT_SILHOUETTE_LIMIT = 10_000
+SAMPLE_SIZE = 2_000
+N_ROUNDS = 10
+CHUNK_SIZE = 100_000
+
+
+def _as_matrix(X):
+    return X.to_numpy() if hasattr(X, 'to_numpy') else X
+
+
+def _cluster_sums(codes, chunk, k):
+    indicator = sparse.csr_matrix((np.ones(len(codes)), (codes, np.arange(len(codes)))), shape=(k, len(codes)))
+    return indicator @ chunk
+
+
+def _chunks(X, chunk_size):
+    for start in range(0, X.shape[0], chunk_size):
+        chunk = X[start:start + chunk_size]
+        yield start, chunk.toarray() if sparse.issparse(chunk) else np.asarray(chunk, dtype=float)
+
+
+def stratified_sample(labels, sample_size, rng):
+    clusters, codes, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    quotas = np.maximum(np.round(counts * sample_size / len(labels)).astype(int), 2)
+    quotas = np.minimum(quotas, counts)
+
+    rows = [rng.choice(np.flatnonzero(codes == c), quotas[c], replace=False) for c in range(len(clusters))]
+    return np.sort(np.concatenate(rows))
+
+
+def sampled_silhouette(X, labels, sample_size=SAMPLE_SIZE, n_rounds=N_ROUNDS, confidence=0.95, random_state=42):
+    X = _as_matrix(X)
+    labels = np.asarray(labels)
+    rng = np.random.default_rng(random_state)
+
+    estimates = []
+    for _ in range(n_rounds):
+        rows = stratified_sample(labels, sample_size, rng)
+        estimates.append(silhouette_score(X[rows], labels[rows]))
+
+    estimates = np.asarray(estimates)
+    mean = float(estimates.mean())
+    if n_rounds > 1:
+        margin = float(stats.t.ppf((1 + confidence) / 2, n_rounds - 1) * estimates.std(ddof=1) / np.sqrt(n_rounds))
+    else:
+        margin = np.nan
+    return {
+        'silhouette': mean,
+        'ci_low': mean - margin,
+        'ci_high': mean + margin,
+        'sampled': True
+    }
+
+
+def silhouette(X, labels, exact_limit=EXACT_SILHOUETTE_LIMIT, **kwargs):
+    if X.shape[0] <= exact_limit:
+        score = float(silhouette_score(X, labels))
+        return {'silhouette': score, 'ci_low': score, 'ci_high': score, 'sampled': False}
+    return sampled_silhouette(X, labels, **kwargs)
+
+
+def centroid_scores(X, labels, centers=None, chunk_size=CHUNK_SIZE):
+    clusters, codes = np.unique(labels, return_inverse=True)
+    k = codes.max() + 1
+    n_features = X.shape[1]
+
+    counts = np.bincount(codes, minlength=k).astype(float)
+    sums = np.zeros((k, n_features))
+    squared_norms = 0.0
+    distance_sums = np.zeros(k)
+
+    if centers is not None:
+        # Os centros são indexados pelo valor do rótulo: um cluster vazio (MiniBatchKMeans) desloca os códigos.
+        centers = np.asarray(centers, dtype=float)
+        if np.issubdtype(clusters.dtype, np.integer) and clusters.min() >= 0 and clusters.max() < len(centers):
+            centers = centers[clusters]
+        else:
+            centers = None
+    if centers is None:
+        for start, chunk in _chunks(X, chunk_size):
+            sums += _cluster_sums(codes[start:start + len(chunk)], chunk, k)
+        centers = sums / counts[:, None]
+        sums = np.zeros((k, n_features))
+
+    # Uma passada acumula somas, normas e distâncias ao centróide de cada cluster.
+    for start, chunk in _chunks(X, chunk_size):
+        chunk_codes = codes[start:start + len(chunk)]
+        sums += _cluster_sums(chunk_codes, chunk, k)
+        squared_norms += float(np.einsum('ij,ij->', chunk, chunk))
+        distance_sums += np.bincount(chunk_codes, np.linalg.norm(chunk - centers[chunk_codes], axis=1), minlength=k)
+
+    means = sums / counts[:, None]
+    overall_mean = sums.sum(axis=0) / counts.sum()
+    within = squared_norms - float(np.sum(counts * np.einsum('ij,ij->i', means, means)))
+    between = float(np.sum(counts * np.sum((means - overall_mean) ** 2, axis=1)))
+
+    n = counts.sum()
+    if k < 2 or within == 0:
+        calinski_harabasz = 1.0 if within == 0 else np.nan
+    else:
+        calinski_harabasz = between * (n - k) / (within * (k - 1))
+
+    spread = distance_sums / counts
+    center_distances = np.linalg.norm(centers[:, None, :] - centers[None, :, :], axis=2)
+    if k < 2 or np.allclose(spread, 0) or np.allclose(center_distances, 0):
+        davies_bouldin = 0.0
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = (spread[:, None] + spread[None, :]) / center_distances
+        ratios[~np.isfinite(ratios)] = 0
+        np.fill_diagonal(ratios, 0)
+        davies_bouldin = float(np.mean(ratios.max(axis=1)))
+
+    return {'davies_bouldin': davies_bouldin, 'calinski_harabasz': float(calinski_harabasz)}
+
+
+def cluster_quality(X, labels, centers=None, exact_limit=EXACT_SILHOUETTE_LIMIT, **kwargs):
+    X = _as_matrix(X)
+    labels = np.asarray(labels)
+    n_clusters = len(np.unique(labels))
+    quality = {'n_clusters': n_clusters}
+    if 1 < n_clusters < X.shape[0]:
+        quality.update(silhouette(X, labels, exact_limit, **kwargs))
+        quality.update(centroid_scores(X, labels, centers))
+    return quality
@@ -0,0 +1,273 @@
+import hashlib
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+SPRING_LAYOUT_LIMIT = 2_000
+
+_memo = {}
+
+
+class InteractionGraph:
+    def __init__(self, names, sources, targets, weights):
+        self.names = np.asarray(names, dtype=object)
+        self.sources = np.asarray(sources, dtype=np.int32)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self._adjacency = None
+        self._fingerprint = None
+
+    @classmethod
+    def from_edges(cls, edges):
+        edges = pd.DataFrame(list(edges), columns=['autor', 'autor_pai', 'peso'])
+        edges = edges[edges['autor'] != edges['autor_pai']]
+
+        codes, names = pd.factorize(pd.concat([edges['autor'], edges['autor_pai']], ignore_index=True))
+        sources, targets = codes[:len(edges)], codes[len(edges):]
+        low, high = np.minimum(sources, targets), np.maximum(sources, targets)
+
+        # Respostas repetidas (nos dois sentidos) entre os mesmos autores viram o peso da aresta.
+        keys, inverse = np.unique(low.astype(np.int64) * len(names) + high, return_inverse=True)
+        weights = np.bincount(inverse, weights=edges['peso'].to_numpy(dtype=float))
+        return cls(names, keys // len(names), keys % len(names), weights)
+
+    @property
+    def n_nodes(self):
+        return len(self.names)
+
+    @property
+    def n_edges(self):
+        return len(self.sources)
+
+    def adjacency(self):
+        if self._adjacency is None:
+            n = self.n_nodes
+            rows = np.concatenate([self.sources, self.targets])
+            cols = np.concatenate([self.targets, self.sources])
+            data = np.concatenate([self.weights, self.weights])
+            self._adjacency = sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+        return self._adjacency
+
+    def fingerprint(self):
+        if self._fingerprint is None:
+            digest = hashlib.sha1()
+            for array in (self.sources, self.targets, self.weights):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            digest.update('\0'.join(map(str, self.names)).encode('utf-8'))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def merge(self, edges):
+        edges = pd.DataFrame(list(edges), columns=['autor', 'autor_pai', 'peso'])
+        edges = edges[edges['autor'] != edges['autor_pai']]
+
+        # Autores já conhecidos mantêm o id; os novos recebem ids no fim da tabela.
+        names = pd.Index(self.names)
+        novos = pd.Index(pd.concat([edges['autor'], edges['autor_pai']]).unique()).difference(names, sort=False)
+        names = names.append(novos)
+        sources = names.get_indexer(edges['autor'])
+        targets = names.get_indexer(edges['autor_pai'])
+
+        n = len(names)
+        low = np.concatenate([self.sources, np.minimum(sources, targets)]).astype(np.int64)
+        high = np.concatenate([self.targets, np.maximum(sources, targets)]).astype(np.int64)
+        weights = np.concatenate([self.weights, edges['peso'].to_numpy(dtype=float)])
+        keys, inverse = np.unique(low * n + high, return_inverse=True)
+        merged = InteractionGraph(names.to_numpy(dtype=object), keys // n, keys % n, np.bincount(inverse, weights=weights))
+        touched = np.unique(np.concatenate([sources, targets])).astype(np.int64)
+        return merged, touched
+
+    def to_networkx(self):
+        import networkx as nx
+
+        G = nx.Graph()
+        G.add_nodes_from(self.names)
+        G.add_weighted_edges_from(zip(self.names[self.sources], self.names[self.targets], self.weights))
+        return G
+
+
+def _move_nodes(adjacency, labels, node_weights, totals, m2, resolution, order):
+    # Laços em Python puro: para graus baixos é bem mais rápido que chamar numpy a cada nó. Só as
+    # listas por nó (rótulos, pesos) são convertidas; as arestas são lidas em fatias dos arrays do CSR.
+    indptr, indices, data = adjacency.indptr, adjacency.indices, adjacency.data
+    community = labels.tolist()
+    weights_of = node_weights.tolist()
+    total = totals.tolist()
+    queue = deque(int(node) for node in order)
+    queued = [False] * len(community)
+    for node in queue:
+        queued[node] = True
+    moved = False
+
+    while queue:
+        node = queue.popleft()
+        queued[node] = False
+        start, end = indptr[node], indptr[node + 1]
+        neighbors = indices[start:end].tolist()
+
+        links = {}
+        for neighbor, weight in zip(neighbors, data[start:end].tolist()):
+            if neighbor != node:
+                links[community[neighbor]] = links.get(community[neighbor], 0.0) + weight
+        if not links:
+            continue
+
+        current = community[node]
+        k = weights_of[node]
+        total[current] -= k
+        scale = resolution * k / m2
+
+        best, best_gain = current, links.get(current, 0.0) - total[current] * scale
+        for candidate, weight in links.items():
+            gain = weight - total[candidate] * scale
+            if gain > best_gain + 1e-12:
+                best, best_gain = candidate, gain
+
+        community[node] = best
+        total[best] += k
+        if best != current:
+            moved = True
+            for neighbor in neighbors:
+                if community[neighbor] != best and not queued[neighbor]:
+                    queued[neighbor] = True
+                    queue.append(neighbor)
+
+    labels[:] = community
+    return moved
+
+
+def _aggregate(adjacency, labels):
+    n_communities = labels.max() + 1
+    membership = sparse.csr_matrix(
+        (np.ones(len(labels)), (np.arange(len(labels)), labels)), shape=(len(labels), n_communities)
+    )
+    return (membership.T @ adjacency @ membership).tocsr()
+
+
+def louvain(adjacency, resolution=1.0, random_state=None, partition=None, active=None):
+    adjacency = sparse.csr_matrix(adjacency, dtype=np.float64)
+    n = adjacency.shape[0]
+    rng = np.random.default_rng(random_state)
+    m2 = adjacency.sum()
+    if m2 == 0:
+        return np.arange(n)
+
+    labels = np.arange(n) if partition is None else np.unique(partition, return_inverse=True)[1]
+    membership = np.arange(n)
+    first_level = True
+
+    while True:
+        node_weights = np.asarray(adjacency.sum(axis=1)).ravel()
+        totals = np.bincount(labels, weights=node_weights, minlength=adjacency.shape[0])
+        if first_level and active is not None:
+            order = rng.permutation(np.asarray(active))
+        else:
+            order = rng.permutation(adjacency.shape[0])
+
+        moved = _move_nodes(adjacency, labels, node_weights, totals, m2, resolution, order)
+        _, labels = np.unique(labels, return_inverse=True)
+        membership = labels[membership]
+        if not moved and not first_level:
+            break
+        if labels.max() + 1 == adjacency.shape[0]:
+            break
+
+        adjacency = _aggregate(adjacency, labels)
+        labels = np.arange(adjacency.shape[0])
+        first_level = False
+    return membership
+
+
+def update_partition(graph, labels, new_edges, resolution=1.0, random_state=None):
+    merged, touched = graph.merge(new_edges)
+    # Autores novos entram como comunidades unitárias; só os nós tocados pelas novas
+    # interações (e, em cascata, os vizinhos dos que mudarem) são revisitados.
+    initial = np.concatenate([labels, labels.max(initial=-1) + 1 + np.arange(merged.n_nodes - graph.n_nodes)])
+    return merged, louvain(merged.adjacency(), resolution, random_state, partition=initial, active=touched)
+
+
+def community_stability(previous_names, previous_labels, names, labels, min_share=0.2):
+    previous = pd.Series(previous_labels, index=pd.Index(previous_names), name='anterior')
+    current = pd.Series(labels, index=pd.Index(names), name='atual')
+    persistent = previous.index.intersection(current.index)
+
+    table = pd.crosstab(previous[persistent], current[persistent])
+    shares = table.div(table.sum(axis=1), axis=0)
+    destination = shares.idxmax(axis=1)
+
+    splits = [int(c) for c, row in shares.iterrows() if (row >= min_share).sum() > 1]
+    sources_per_destination = destination.value_counts()
+    merges = [int(c) for c in sources_per_destination[sources_per_destination > 1].index]
+    moved = (current[persistent] != destination.reindex(previous[persistent]).to_numpy())
+
+    return {
+        'previous_communities': int(previous.nunique()),
+        'communities': int(current.nunique()),
+        'persistent_authors': int(len(persistent)),
+        'new_authors': int(len(current.index.difference(previous.index))),
+        'splits': splits,
+        'merges': merges,
+        'churn': float(moved.mean()) if len(persistent) else 0.0
+    }
+
+
+def save_state(path, graph, labels, **extra):
+    # Gravado pelo arquivo aberto: com um caminho, o savez acrescentaria '.npz' e load_state não o encontraria.
+    with open(path, 'wb') as f:
+        np.savez_compressed(f, names=graph.names.astype(str), sources=graph.sources, targets=graph.targets,
+                            weights=graph.weights, labels=labels, **extra)
+
+
+def load_state(path):
+    with np.load(path, allow_pickle=False) as state:
+        graph = InteractionGraph(state['names'].astype(object), state['sources'], state['targets'], state['weights'])
+        extra = {key: state[key].item() for key in state.files
+                 if key not in ('names', 'sources', 'targets', 'weights', 'labels')}
+        return graph, state['labels'], extra
+
+
+def modularity(adjacency, labels, resolution=1.0):
+    adjacency = sparse.csr_matrix(adjacency)
+    m2 = adjacency.sum()
+    if m2 == 0:
+        return 0.0
+    _, labels = np.unique(labels, return_inverse=True)
+    aggregated = _aggregate(adjacency, labels)
+    internal = aggregated.diagonal()
+    totals = np.asarray(aggregated.sum(axis=1)).ravel()
+    return float(np.sum(internal / m2 - resolution * (totals / m2) ** 2))
+
+
+def memoized(graph, kind, params, compute):
+    key = (graph.fingerprint(), kind, tuple(sorted(params.items())))
+    if key not in _memo:
+        _memo[key] = compute()
+    return _memo[key]
+
+
+def community_labels(graph, resolution=1.0, random_state=None):
+    return memoized(graph, 'louvain', {'resolution': resolution, 'random_state': random_state},
+                    lambda: louvain(graph.adjacency(), resolution, random_state))
+
+
+def best_partition(graph, resolution=1.0, random_state=None):
+    labels = community_labels(graph, resolution, random_state)
+    return dict(zip(graph.names, labels.tolist()))
+
+
+def layout(graph, k=0.15, iterations=20, seed=None, labels=None, spring_limit=SPRING_LAYOUT_LIMIT):
+    import networkx as nx
+    from renderizacao import grouped_layout
+
+    def compute():
+        if graph.n_nodes <= spring_limit:
+            return nx.spring_layout(graph.to_networkx(), k=k, iterations=iterations, seed=seed)
+        # Grafos grandes: forças só entre comunidades e posições dos autores dentro de cada uma.
+        groups = community_labels(graph) if labels is None else labels
+        return dict(zip(graph.names, grouped_layout(graph.adjacency(), groups, seed)))
+
+    digest = None if labels is None else hashlib.sha1(np.ascontiguousarray(labels).tobytes()).hexdigest()
+    return memoized(graph, 'layout', {'k': k, 'iterations': iterations, 'seed': seed, 'labels': digest,
+                                      'spring_limit': spring_limit}, compute)
@@ -0,0 +1,116 @@
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+import numpy as np
+from scipy import sparse
+
+# Com RENDER_DIR definido as figuras são gravadas em arquivo (sem janelas), para execuções agendadas.
+RENDER_DIR = os.environ.get('RENDER_DIR')
+RENDER_FORMAT = os.environ.get('RENDER_FORMAT', 'png')
+MAX_WORKERS = 4
+SPRING_GROUP_LIMIT = 2_000
+
+_pool = None
+_pending = []
+
+if RENDER_DIR:
+    plt.switch_backend('Agg')
+
+
+def _save(figure, path):
+    figure.savefig(path, dpi=150, bbox_inches='tight')
+    return path
+
+
+def wait():
+    global _pool
+    paths = [future.result() for future in _pending]
+    _pending.clear()
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+    return paths
+
+
+def show(name):
+    global _pool
+    if not RENDER_DIR:
+        plt.show()
+        return
+
+    # A figura é serializada para um processo do pool, que faz a rasterização e grava o arquivo.
+    figure = plt.gcf()
+    plt.close(figure)
+    os.makedirs(RENDER_DIR, exist_ok=True)
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+        atexit.register(wait)
+    _pending.append(_pool.submit(_save, figure, os.path.join(RENDER_DIR, f"{name}.{RENDER_FORMAT}")))
+
+
+def spiral(index, n):
+    # Disco de Vogel (filotaxia): pontos espalhados uniformemente, o índice 0 no centro.
+    radius = np.sqrt(index + 0.5) / np.sqrt(n)
+    angle = index * np.pi * (3 - np.sqrt(5))
+    return np.column_stack([radius * np.cos(angle), radius * np.sin(angle)])
+
+
+def group_centers(adjacency, labels, seed=None, spring_limit=SPRING_GROUP_LIMIT):
+    import networkx as nx
+
+    n_groups = labels.max() + 1
+    sizes = np.bincount(labels, minlength=n_groups)
+    membership = sparse.csr_matrix((np.ones(len(labels)), (np.arange(len(labels)), labels)),
+                                   shape=(len(labels), n_groups))
+    aggregated = (membership.T @ adjacency @ membership).tocoo()
+
+    # Só os maiores grupos entram no layout de forças; os demais vão para um anel externo.
+    largest = np.argsort(-sizes, kind='stable')[:spring_limit]
+    keep = np.zeros(n_groups, dtype=bool)
+    keep[largest] = True
+    G = nx.Graph()
+    G.add_nodes_from(largest.tolist())
+    mask = keep[aggregated.row] & keep[aggregated.col] & (aggregated.row < aggregated.col)
+    G.add_weighted_edges_from(zip(aggregated.row[mask].tolist(), aggregated.col[mask].tolist(),
+                                  aggregated.data[mask].tolist()))
+    positions = nx.spring_layout(G, seed=seed, weight='weight')
+
+    centers = np.zeros((n_groups, 2))
+    centers[largest] = [positions[group] for group in largest.tolist()]
+    rest = np.flatnonzero(~keep)
+    if len(rest):
+        angle = np.linspace(0, 2 * np.pi, len(rest), endpoint=False)
+        centers[rest] = 1.3 * np.column_stack([np.cos(angle), np.sin(angle)])
+    return centers, sizes
+
+
+def grouped_layout(adjacency, labels, seed=None, spring_limit=SPRING_GROUP_LIMIT):
+    adjacency = sparse.csr_matrix(adjacency, dtype=np.float64)
+    _, labels = np.unique(labels, return_inverse=True)
+    centers, sizes = group_centers(adjacency, labels, seed, spring_limit)
+
+    # Cada grupo ocupa um disco proporcional ao seu tamanho, com os nós de maior grau no centro.
+    radius = 0.5 * np.sqrt(sizes / sizes.sum())
+    order, rank = _ranked(adjacency, labels, sizes)
+    group = labels[order]
+
+    positions = np.empty((len(labels), 2))
+    positions[order] = centers[group] + spiral(rank, sizes[group]) * radius[group, None]
+    return positions
+
+
+def _ranked(adjacency, labels, sizes):
+    # Nós ordenados por grupo e, dentro do grupo, por grau decrescente; rank é a posição no grupo.
+    degree = np.diff(adjacency.indptr)
+    order = np.lexsort((-degree, labels))
+    rank = np.arange(len(order)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return order, rank
+
+
+def top_nodes(adjacency, labels, top_k):
+    adjacency = sparse.csr_matrix(adjacency)
+    _, labels = np.unique(labels, return_inverse=True)
+    order, rank = _ranked(adjacency, labels, np.bincount(labels))
+    return np.sort(order[rank < top_k])
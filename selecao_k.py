@@ -0,0 +1,118 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import pairwise_distances_argmin_min
+
+from qualidade import silhouette
+
+MINIBATCH_THRESHOLD = 50_000
+SAMPLE_SIZE = 10_000
+
+
+@dataclass
+class KSelection:
+    model: object
+    k: int
+    k_values: list
+    inertia: list
+    scores: list = field(default_factory=list)
+
+
+def label_dtype(k):
+    # Rótulos de cluster em int8/int16: um ou dois bytes por linha em vez de oito.
+    return np.int8 if k <= np.iinfo(np.int8).max else np.int16
+
+
+def make_kmeans(k, n_samples, init='k-means++', minibatch=None, random_state=42):
+    if minibatch is None:
+        minibatch = n_samples >= MINIBATCH_THRESHOLD
+    n_init = 'auto' if isinstance(init, str) else 1
+    if minibatch:
+        return MiniBatchKMeans(n_clusters=k, init=init, n_init=n_init, random_state=random_state)
+    return KMeans(n_clusters=k, init=init, n_init=n_init, random_state=random_state)
+
+
+def fit_kmeans(X, k, init='k-means++', minibatch=None, sample_weight=None, random_state=42):
+    model = make_kmeans(k, X.shape[0], init, minibatch, random_state)
+    return model.fit(X, sample_weight=sample_weight)
+
+
+def farthest_point(X, centers, sample_size=SAMPLE_SIZE, random_state=42):
+    rng = np.random.default_rng(random_state)
+    rows = np.arange(X.shape[0])
+    if len(rows) > sample_size:
+        rows = rng.choice(rows, sample_size, replace=False)
+    sample = X[rows]
+    _, distances = pairwise_distances_argmin_min(sample, centers)
+    point = sample[int(np.argmax(distances))]
+    return point.toarray() if hasattr(point, 'toarray') else np.atleast_2d(point)
+
+
+def knee_point(k_values, inertia, k_max=None):
+    x = np.asarray(k_values, dtype=float)
+    y = np.asarray(inertia, dtype=float)
+    if len(x) < 3 or y.max() == y.min():
+        return int(x[0])
+
+    # Com parada antecipada a curva termina logo após o cotovelo; normalizar pelo
+    # maior k pedido trata a cauda não ajustada como plana.
+    x_norm = (x - x[0]) / ((k_max if k_max is not None else x[-1]) - x[0])
+    y_norm = (y - y.min()) / (y.max() - y.min())
+    return int(x[np.argmax((1 - x_norm) - y_norm)])
+
+
+def flattened(inertia, tol, patience):
+    if len(inertia) <= patience:
+        return False
+    if inertia[0] == 0:
+        return True
+    drops = -np.diff(inertia[-(patience + 1):]) / inertia[0]
+    return bool(np.all(drops < tol))
+
+
+def select_k(X, k_values=range(2, 11), criterion='elbow', warm_start=False, minibatch=None, n_jobs=-1,
+             tol=0.01, patience=2, sample_weight=None, random_state=42):
+    if hasattr(X, 'to_numpy'):
+        X = X.to_numpy()
+    k_values = sorted(k_values)
+    models = []
+
+    if warm_start:
+        for k in k_values:
+            init = 'k-means++'
+            if models and models[-1].n_clusters == k - 1:
+                centers = models[-1].cluster_centers_
+                init = np.vstack([centers, farthest_point(X, centers, random_state=random_state)])
+            models.append(fit_kmeans(X, k, init, minibatch, sample_weight, random_state))
+            if flattened([m.inertia_ for m in models], tol, patience):
+                break
+    else:
+        batch_size = effective_n_jobs(n_jobs)
+        with Parallel(n_jobs=n_jobs, prefer='threads') as parallel:
+            for start in range(0, len(k_values), batch_size):
+                models.extend(parallel(
+                    delayed(fit_kmeans)(X, k, 'k-means++', minibatch, sample_weight, random_state)
+                    for k in k_values[start:start + batch_size]
+                ))
+                if flattened([m.inertia_ for m in models], tol, patience):
+                    break
+
+    fitted_k = [m.n_clusters for m in models]
+    inertia = [m.inertia_ for m in models]
+
+    scores = []
+    if criterion == 'silhouette':
+        scores = [
+            silhouette(X, m.labels_, random_state=random_state)['silhouette']
+            if 1 < m.n_clusters < X.shape[0] else np.nan
+            for m in models
+        ]
+        best = fitted_k[int(np.nanargmax(scores))]
+    elif criterion == 'elbow':
+        best = knee_point(fitted_k, inertia, k_values[-1])
+    else:
+        raise ValueError(f"Critério desconhecido: {criterion!r}")
+
+    return KSelection(models[fitted_k.index(best)], best, fitted_k, inertia, scores)
@@ -0,0 +1,153 @@
+import time
+from contextlib import closing
+
+import numpy as np
+
+from coleta import record_fixture
+from interacoes import UNKNOWN_AUTHOR
+
+MEAN_COMMENTS = 9
+AUTHOR_EXPONENT = 1.1
+TOP_LEVEL_SHARE = 0.4
+DELETED_SHARE = 0.01
+CHUNK_SIZE = 10_000
+START_UTC = 1_672_531_200
+SPAN = 365 * 24 * 3600
+
+TOPICS = [
+    ['orientador', 'prazo', 'banca', 'defesa', 'capítulo', 'revisão', 'metodologia', 'entrega', 'cronograma'],
+    ['ansiedade', 'cansaço', 'terapia', 'desânimo', 'pressão', 'sono', 'apoio', 'família', 'saúde'],
+    ['estatística', 'dados', 'python', 'planilha', 'regressão', 'amostra', 'gráfico', 'código', 'análise'],
+    ['artigo', 'referências', 'abnt', 'citação', 'periódico', 'scielo', 'resumo', 'formatação', 'normas'],
+    ['estágio', 'vaga', 'empresa', 'salário', 'entrevista', 'currículo', 'mercado', 'contrato', 'emprego'],
+]
+COMMON_WORDS = ['dúvida', 'ajuda', 'semestre', 'professor', 'faculdade', 'universidade', 'tema', 'pesquisa',
+                'problema', 'ideia', 'tempo', 'ano', 'gente', 'dica', 'experiência', 'projeto']
+FLAIRS = ['Dúvida', 'Desabafo', 'Discussão', 'Ajuda', None, None]
+
+
+def base36(values, prefix):
+    return [prefix + np.base_repr(int(value), 36).lower() for value in values]
+
+
+def zipf_sampler(n_authors, exponent=AUTHOR_EXPONENT):
+    # Atividade dos autores com cauda pesada: poucos autores escrevem a maior parte.
+    weights = 1 / np.arange(1, n_authors + 1) ** exponent
+    cumulative = np.cumsum(weights / weights.sum())
+    names = np.asarray(base36(range(n_authors), 'u_'), dtype=object)
+    return lambda rng, size: names[np.minimum(np.searchsorted(cumulative, rng.random(size)), n_authors - 1)]
+
+
+def texts(rng, topics, min_words, max_words):
+    lengths = rng.integers(min_words, max_words + 1, len(topics))
+    result = []
+    for topic, length in zip(topics.tolist(), lengths.tolist()):
+        vocabulary = TOPICS[topic] if rng.random() < 0.7 else COMMON_WORDS
+        result.append(' '.join(rng.choice(vocabulary, length).tolist()))
+    return result
+
+
+def comment_counts(rng, n_posts, mean=MEAN_COMMENTS, sigma=1.2):
+    return np.floor(rng.lognormal(np.log(mean) - sigma ** 2 / 2, sigma, n_posts)).astype(np.int64)
+
+
+def generate_chunk(rng, first_post, n_posts, first_comment, sample_author, subreddit_name, with_comments=True):
+    post_ids = base36(range(first_post, first_post + n_posts), 'p')
+    topics = rng.integers(0, len(TOPICS), n_posts)
+    created = np.sort(START_UTC + rng.random(n_posts) * SPAN)
+    counts = comment_counts(rng, n_posts)
+    authors = sample_author(rng, n_posts)
+    authors[rng.random(n_posts) < DELETED_SHARE] = UNKNOWN_AUTHOR
+    scores = np.floor(rng.pareto(1.5, n_posts) * 5 + counts * rng.random(n_posts)).astype(np.int64)
+    self_posts = rng.random(n_posts) < 0.9
+    flairs = rng.choice(len(FLAIRS), n_posts)
+
+    posts = [{
+        'id': post_id,
+        'title': title,
+        'author': author,
+        'score': score,
+        'num_comments': count,
+        'created_utc': created_utc,
+        'upvote_ratio': round(ratio, 2),
+        'selftext': selftext,
+        'link_flair_text': FLAIRS[flair],
+        'url': (f"https://www.reddit.com/r/{subreddit_name}/comments/{post_id}/" if self_post
+                else f"https://example.com/{post_id}")
+    } for post_id, title, author, score, count, created_utc, ratio, selftext, flair, self_post in zip(
+        post_ids, texts(rng, topics, 3, 10), authors.tolist(), scores.tolist(), counts.tolist(), created.tolist(),
+        rng.beta(8, 2, n_posts).tolist(), texts(rng, topics, 20, 120), flairs.tolist(), self_posts.tolist()
+    )]
+    if not with_comments:
+        return posts, []
+
+    # Árvore de respostas: cada comentário responde ao post ou a um comentário anterior do mesmo post.
+    n_comments = int(counts.sum())
+    post_of = np.repeat(np.arange(n_posts), counts)
+    position = np.arange(n_comments) - np.repeat(np.cumsum(counts) - counts, counts)
+    parent_position = np.floor(rng.random(n_comments) * position).astype(np.int64)
+    top_level = (position == 0) | (rng.random(n_comments) < TOP_LEVEL_SHARE)
+    comment_numbers = first_comment + np.arange(n_comments)
+    parent_numbers = comment_numbers - position + parent_position
+
+    comment_ids = base36(comment_numbers, 'c')
+    parent_comment_ids = base36(parent_numbers, 't1_c')
+    comment_authors = sample_author(rng, n_comments)
+    comment_authors[rng.random(n_comments) < DELETED_SHARE] = None
+    delays = np.cumsum(rng.exponential(1800, n_comments))
+    delays -= delays[np.repeat(np.cumsum(counts) - counts, counts)]
+    comment_created = created[post_of] + delays + 60
+
+    comments = [{
+        'id': comment_id,
+        'link_id': post_ids[post],
+        'parent_id': 't3_' + post_ids[post] if top else parent_id,
+        'author': author,
+        'body': body,
+        'created_utc': created_utc
+    } for comment_id, post, top, parent_id, author, body, created_utc in zip(
+        comment_ids, post_of.tolist(), top_level.tolist(), parent_comment_ids, comment_authors.tolist(),
+        texts(rng, topics[post_of], 5, 40), comment_created.tolist()
+    )]
+    return posts, comments
+
+
+def generate(n_posts, n_authors=None, with_comments=True, subreddit_name='sintetico', chunk_size=CHUNK_SIZE,
+             random_state=42):
+    rng = np.random.default_rng(random_state)
+    sample_author = zipf_sampler(n_authors or max(50, n_posts * (1 + MEAN_COMMENTS) // 20))
+    first_comment = 0
+    for first_post in range(0, n_posts, chunk_size):
+        posts, comments = generate_chunk(rng, first_post, min(chunk_size, n_posts - first_post), first_comment,
+                                         sample_author, subreddit_name, with_comments)
+        first_comment += len(comments)
+        yield posts, comments
+
+
+def posts_for_items(n_items, mean_comments=MEAN_COMMENTS):
+    return max(1, round(n_items / (1 + mean_comments)))
+
+
+def populate_cache(cache, subreddit_name, query, n_posts, time_filter='all', with_comments=True, **kwargs):
+    key = (subreddit_name, query, time_filter)
+    n_comments = 0
+    with closing(cache.connect()) as conn, conn:
+        conn.execute("DELETE FROM posts WHERE subreddit = ? AND query = ? AND time_filter = ?", key)
+        rank = 0
+        for posts, comments in generate(n_posts, with_comments=with_comments, subreddit_name=subreddit_name,
+                                        **kwargs):
+            cache.insert(conn, key, posts, comments, rank, with_comments)
+            rank += len(posts)
+            n_comments += len(comments)
+        conn.execute("INSERT OR REPLACE INTO collections VALUES (?, ?, ?, ?, ?, ?)",
+                     (*key, n_posts, int(with_comments), time.time()))
+    return n_posts, n_comments
+
+
+def write_fixture(fixtures_dir, subreddit_name, query, n_posts, time_filter='all', **kwargs):
+    posts, comments = [], []
+    for chunk_posts, chunk_comments in generate(n_posts, subreddit_name=subreddit_name, **kwargs):
+        posts.extend(chunk_posts)
+        comments.extend(chunk_comments)
+    record_fixture(fixtures_dir, subreddit_name, query, time_filter, posts, comments)
+    return posts, comments
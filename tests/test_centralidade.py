@@ -0,0 +1,44 @@
+import networkx as nx
+import numpy as np
+
+from centralidade import betweenness, clustering, components, degree_centrality, eigenvector_centrality
+
+
+def grafo():
+    # Uma componente aleatória, uma completa (caminho fechado da contagem de triângulos) e um nó isolado.
+    G = nx.gnp_random_graph(40, 0.12, seed=3)
+    G.add_edges_from((40 + i, 40 + j) for i in range(5) for j in range(i + 1, 5))
+    G.add_node(45)
+    return G, nx.to_scipy_sparse_array(G, nodelist=range(46), format='csr')
+
+
+def valores(metrica, G):
+    return np.array([metrica[node] for node in range(G.number_of_nodes())])
+
+
+def test_grau_e_componentes_iguais_ao_networkx():
+    G, adjacency = grafo()
+    assert np.allclose(degree_centrality(adjacency), valores(nx.degree_centrality(G), G))
+    rotulos = components(adjacency)
+    assert len(set(rotulos)) == nx.number_connected_components(G)
+    for componente in nx.connected_components(G):
+        assert len({rotulos[node] for node in componente}) == 1
+
+
+def test_clustering_igual_ao_networkx():
+    G, adjacency = grafo()
+    assert np.allclose(clustering(adjacency), valores(nx.clustering(G), G))
+
+
+def test_betweenness_igual_ao_networkx():
+    G, adjacency = grafo()
+    assert np.allclose(betweenness(adjacency), valores(nx.betweenness_centrality(G), G))
+
+
+def test_autovetor_igual_ao_networkx_na_maior_componente():
+    G, adjacency = grafo()
+    maior = max(nx.connected_components(G), key=len)
+    esperado = nx.eigenvector_centrality_numpy(G.subgraph(maior))
+    centralidade = eigenvector_centrality(adjacency)
+    assert np.allclose([centralidade[node] for node in maior], [esperado[node] for node in maior], atol=1e-6)
+    assert not centralidade[[node for node in G if node not in maior]].any()
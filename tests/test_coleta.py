@@ -0,0 +1,126 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from coleta import Cache, Collector
+
+KEY = ('faculdadeBR', 'TCC', 'all')
+
+
+class FakeSource:
+    # Busca em memória: posts do mais relevante ao menos relevante, cada um com um comentário.
+    def __init__(self, n_posts, start=1_000):
+        self.posts = [self.post(i, start + i) for i in range(n_posts)]
+        self.searches = []
+        self.comment_requests = []
+
+    @staticmethod
+    def post(i, created_utc):
+        return {'id': f"p{i}", 'title': f"post {i}", 'author': f"autor{i}", 'selftext': '', 'created_utc': created_utc}
+
+    def search(self, subreddit_name, query, limit, time_filter='all', sort='relevance', since=None):
+        self.searches.append((limit, sort, since))
+        posts = self.posts
+        if sort == 'new':
+            posts = sorted(posts, key=lambda post: post['created_utc'], reverse=True)
+        if since is not None:
+            posts = [post for post in posts if post['created_utc'] >= since]
+        return posts[:limit]
+
+    def comments(self, post_id):
+        self.comment_requests.append(post_id)
+        return [{'id': f"c_{post_id}", 'link_id': post_id, 'parent_id': f"t3_{post_id}", 'author': 'comentador',
+                 'body': 'resposta', 'created_utc': 2_000}]
+
+
+@pytest.fixture
+def coletor(tmp_path):
+    return Collector(FakeSource(20), Cache(str(tmp_path / 'cache.db')), max_workers=2)
+
+
+def collection(cache):
+    with closing(cache.connect()) as conn:
+        return conn.execute("SELECT post_limit FROM collections").fetchone()[0], \
+            conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+
+def test_colecao_nao_encolhe(coletor):
+    coletor.collect(*KEY[:2], 20)
+    posts, comments = coletor.collect(*KEY[:2], 5, with_comments=True)
+
+    assert [post['id'] for post in posts] == [f"p{i}" for i in range(5)]
+    assert len(comments) == 5
+    assert collection(coletor.cache) == (20, 20)
+    # Só faltavam comentários: nenhuma busca nova, comentários só dos 5 posts pedidos.
+    assert len(coletor.source.searches) == 1
+    assert sorted(coletor.source.comment_requests) == sorted(f"p{i}" for i in range(5))
+
+    posts, _ = coletor.collect(*KEY[:2], 20)
+    assert len(posts) == 20 and len(coletor.source.searches) == 1
+
+
+def test_comentarios_faltando_so_dos_posts_sem_comentarios(coletor):
+    coletor.collect(*KEY[:2], 5, with_comments=True)
+    coletor.collect(*KEY[:2], 10)
+    posts, comments = coletor.collect(*KEY[:2], 10, with_comments=True)
+
+    assert len(posts) == 10 and len(comments) == 10
+    assert len(coletor.source.comment_requests) == 10
+
+
+def test_busca_nova_mantem_posts_incrementais(coletor):
+    coletor.collect(*KEY[:2], 20)
+    coletor.source.posts.append(FakeSource.post(99, 5_000))
+    novos, _ = coletor.collect_incremental(*KEY[:2])
+    assert [post['id'] for post in novos] == ['p99']
+
+    coletor.collect(*KEY[:2], 5, refresh=True)
+    ids = [post['id'] for post in coletor.collect(*KEY[:2], 21)[0]]
+    assert ids[:5] == [f"p{i}" for i in range(5)]
+    assert 'p99' in ids and collection(coletor.cache) == (21, 21)
+    assert len(coletor.source.searches) == 3
+
+
+def test_cache_antigo_migra_marca_de_comentarios(tmp_path):
+    path = str(tmp_path / 'antigo.db')
+    with closing(sqlite3.connect(path)) as conn, conn:
+        conn.executescript("""
+            CREATE TABLE collections (subreddit TEXT, query TEXT, time_filter TEXT, post_limit INTEGER,
+                                      with_comments INTEGER, fetched_at REAL,
+                                      PRIMARY KEY (subreddit, query, time_filter));
+            CREATE TABLE posts (subreddit TEXT, query TEXT, time_filter TEXT, id TEXT, rank INTEGER,
+                                created_utc REAL, data TEXT, PRIMARY KEY (subreddit, query, time_filter, id));
+            INSERT INTO collections VALUES ('faculdadeBR', 'TCC', 'all', 1, 1, 0);
+            INSERT INTO posts VALUES ('faculdadeBR', 'TCC', 'all', 'p0', 0, 1000,
+                                      '{"id": "p0", "created_utc": 1000}');
+        """)
+
+    posts, comments = Cache(path).lookup(KEY, 1, with_comments=True)
+    assert [post['id'] for post in posts] == ['p0'] and comments == []
+
+
+def test_marca_parte_do_cache_e_avanca_sem_posts_novos(coletor):
+    coletor.collect(*KEY[:2], 20)
+    assert coletor.cache.watermark(KEY) == (1_019, {'p19'})
+
+    for _ in range(2):
+        novos, _ = coletor.collect_incremental(*KEY[:2])
+        assert novos == []
+        assert coletor.source.searches[-1] == (None, 'new', 1_019)
+
+    coletor.source.posts.append(FakeSource.post(50, 3_000))
+    novos, _ = coletor.collect_incremental(*KEY[:2])
+    assert [post['id'] for post in novos] == ['p50']
+    assert coletor.cache.watermark(KEY) == (3_000, {'p50'})
+    coletor.collect_incremental(*KEY[:2])
+    assert coletor.source.searches[-1][2] == 3_000
+
+
+def test_posts_no_mesmo_instante_da_marca_nao_se_repetem(coletor):
+    coletor.collect(*KEY[:2], 20)
+    coletor.source.posts.append(FakeSource.post(60, 1_019))
+    novos, _ = coletor.collect_incremental(*KEY[:2])
+    assert [post['id'] for post in novos] == ['p60']
+    assert coletor.cache.watermark(KEY) == (1_019, {'p19', 'p60'})
+    assert coletor.collect_incremental(*KEY[:2])[0] == []
@@ -0,0 +1,12 @@
+import pytest
+
+from comparativo import run, slug
+
+
+def test_slug_distingue_limites():
+    assert slug('faculdadeBR', 'TCC', 50) != slug('faculdadeBR', 'TCC', 200)
+
+
+def test_alvos_com_mesmo_diretorio_sao_rejeitados(tmp_path):
+    with pytest.raises(ValueError, match='mesmo diretório'):
+        run([('faculdadeBR', 'TCC 2', 50), ('faculdadeBR', 'TCC_2', 50)], output_dir=str(tmp_path))
@@ -0,0 +1,80 @@
+import time
+
+from coleta import Cache, Collector
+from comunidade import recent_interactions
+from interacoes import interaction_edges, new_interactions
+from rede import InteractionGraph, louvain, update_partition
+
+SUBREDDIT, QUERY = 'faculdadeBR', 'TCC'
+
+
+class Source:
+    def __init__(self):
+        self.posts = []
+        self.comments_by_post = {}
+
+    def add_post(self, post_id, author, created_utc):
+        self.posts.append({'id': post_id, 'title': post_id, 'author': author, 'selftext': '',
+                           'created_utc': created_utc})
+        self.comments_by_post[post_id] = []
+
+    def reply(self, comment_id, post_id, author, created_utc, parent=None):
+        self.comments_by_post[post_id].append({
+            'id': comment_id, 'link_id': post_id, 'parent_id': f"t1_{parent}" if parent else f"t3_{post_id}",
+            'author': author, 'body': 'resposta', 'created_utc': created_utc
+        })
+
+    def search(self, subreddit_name, query, limit, time_filter='all', sort='relevance', since=None):
+        posts = self.posts
+        if sort == 'new':
+            posts = sorted(posts, key=lambda post: post['created_utc'], reverse=True)
+        if since is not None:
+            posts = [post for post in posts if post['created_utc'] >= since]
+        return posts[:limit]
+
+    def comments(self, post_id):
+        return list(self.comments_by_post[post_id])
+
+
+def edge_set(graph):
+    return {frozenset((graph.names[u], graph.names[v])) for u, v in zip(graph.sources, graph.targets)}
+
+
+def test_tres_execucoes_incrementais(tmp_path):
+    agora = time.time()
+    source = Source()
+    source.add_post('p0', 'ana', agora - 100)
+    source.add_post('p1', 'bruno', agora - 90)
+    source.reply('c0', 'p0', 'bruno', agora - 80)
+    source.reply('c1', 'p1', 'ana', agora - 70)
+    coletor = Collector(source, Cache(str(tmp_path / 'cache.db')), max_workers=2)
+
+    # 1ª execução: grafo completo a partir dos 2 posts do limite.
+    posts, comments = coletor.collect(SUBREDDIT, QUERY, 2, with_comments=True)
+    rede = InteractionGraph.from_edges(interaction_edges(new_interactions(posts, comments, float('-inf'))))
+    rotulos = louvain(rede.adjacency(), random_state=0)
+    ultimo = max(comment['created_utc'] for comment in comments)
+
+    # 2ª execução: um post novo (fora do limite de 2) com uma resposta.
+    source.add_post('p2', 'carla', agora - 60)
+    source.reply('c2', 'p2', 'davi', agora - 50)
+    novos, donos, recentes, novas = recent_interactions(coletor, SUBREDDIT, QUERY, ultimo)
+    assert [post['id'] for post in novos] == ['p2']
+    assert novas == [('davi', 'carla')]
+    rede, rotulos = update_partition(rede, rotulos, interaction_edges(novas), random_state=0)
+    ultimo = max([ultimo] + [comment['created_utc'] for comment in recentes])
+
+    # 3ª execução: nenhum post novo, mas uma resposta nova no post de posição 2.
+    source.reply('c3', 'p2', 'ana', agora - 40, parent='c2')
+    novos, donos, recentes, novas = recent_interactions(coletor, SUBREDDIT, QUERY, ultimo)
+    assert novos == []
+    assert 'p2' in {post['id'] for post in donos}
+    assert novas == [('ana', 'davi')]
+    rede, rotulos = update_partition(rede, rotulos, interaction_edges(novas), random_state=0)
+
+    assert frozenset(('ana', 'davi')) in edge_set(rede)
+    assert len(rotulos) == rede.n_nodes == 4
+
+    # O cache continua devolvendo só os 2 primeiros posts: a aresta nova não viria dele.
+    posts, _ = coletor.collect(SUBREDDIT, QUERY, 2, with_comments=True)
+    assert [post['id'] for post in posts] == ['p0', 'p1']
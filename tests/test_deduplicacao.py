@@ -0,0 +1,26 @@
+import pandas as pd
+
+from deduplicacao import deduplicate
+
+LONGO = 'preciso de ajuda com a formatação do tcc nas normas da abnt antes da entrega final para a banca'
+
+
+def test_textos_curtos_identicos_viram_um_grupo():
+    textos = ['texto qualquer'] * 5 + ['outro texto']
+    representantes, grupo, pesos = deduplicate(textos)
+    assert len(textos) - len(representantes) == 4
+    assert sorted(pesos.tolist()) == [1, 5]
+
+
+def test_textos_curtos_comparados_apos_normalizar_espacos():
+    representantes, grupo, _ = deduplicate(pd.Series(['bom dia', ' bom   dia ', 'boa noite'], index=[7, 3, 9]))
+    assert grupo[0] == grupo[1] != grupo[2]
+    assert len(representantes) == 2
+
+
+def test_quase_duplicatas_longas_agrupadas():
+    textos = [LONGO, LONGO + ' obrigado', 'qual a melhor forma de conseguir estágio em empresa grande no segundo ano']
+    representantes, grupo, pesos = deduplicate(textos)
+    assert grupo[0] == grupo[1] != grupo[2]
+    assert representantes.tolist() == [0, 2]
+    assert pesos.tolist() == [2, 1]
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from instrumentacao import RunReport, current_rss_mb
+
+
+@pytest.mark.skipif(current_rss_mb() is None, reason='sem /proc/self/statm')
+def test_pico_de_memoria_por_etapa(tmp_path):
+    relatorio = RunReport('teste', report_dir=str(tmp_path))
+    relatorio.start('grande')
+    bloco = np.ones(200 * 2 ** 20 // 8)
+    del bloco
+    relatorio.start('pequena')
+    relatorio.finish()
+
+    grande, pequena = relatorio.stages
+    assert grande['peak_rss_mb'] >= 200
+    assert pequena['peak_rss_mb'] < grande['peak_rss_mb'] - 150
+    assert pequena['process_peak_rss_mb'] >= grande['peak_rss_mb']
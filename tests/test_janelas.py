@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from interacoes import interaction_edges
+from janelas import DAY, SlidingGraph, interaction_events, match_labels, sliding_windows
+from rede import InteractionGraph
+
+AUTORES = ['ana', 'bruno', 'carla', 'davi', 'eva', 'fabio']
+
+
+def conversa(n_posts=12, seed=0):
+    rng = np.random.default_rng(seed)
+    posts, comments = [], []
+    for i in range(n_posts):
+        inicio = i * DAY / 2
+        autor = AUTORES[i % len(AUTORES)]
+        posts.append({'id': f"p{i}", 'title': f"post {i}", 'author': autor,
+                      'selftext': 'dúvida sobre o tcc e a banca', 'created_utc': inicio})
+        anterior = None
+        for j in range(4):
+            respondente = str(rng.choice([a for a in AUTORES if a != autor]))
+            comments.append({'id': f"c{i}_{j}", 'link_id': f"p{i}",
+                             'parent_id': f"t1_c{i}_{anterior}" if anterior is not None else f"t3_p{i}",
+                             'author': respondente, 'body': 'resposta sobre o prazo da entrega',
+                             'created_utc': inicio + (j + 1) * 3600})
+            anterior = j
+    return posts, comments
+
+
+def arestas(graph):
+    return {frozenset((graph.names[u], graph.names[v])): w
+            for u, v, w in zip(graph.sources, graph.targets, graph.weights)}
+
+
+def test_janela_deslizante_igual_a_reconstruir():
+    posts, comments = conversa()
+    eventos = interaction_events(posts, comments)
+    pares = list(zip(eventos['autor'], eventos['autor_pai']))
+    grafo = SlidingGraph()
+    lo = hi = 0
+    for new_lo, new_hi in [(0, 10), (4, 20), (15, 22), (30, 40), (31, len(pares))]:
+        grafo.remove(pares[lo:min(hi, new_lo)])
+        grafo.add(pares[max(hi, new_lo):new_hi])
+        lo, hi = new_lo, new_hi
+
+        esperado = InteractionGraph.from_edges(interaction_edges(pares[lo:hi]))
+        assert arestas(grafo.snapshot()) == arestas(esperado)
+        assert grafo.degree_distribution().tolist() == np.bincount(np.diff(esperado.adjacency().indptr)).tolist()
+
+
+def test_ids_de_comunidade_estaveis_entre_janelas():
+    anterior = pd.Series({'ana': 0, 'bruno': 0, 'carla': 1, 'davi': 1})
+    # Mesmas comunidades com rótulos trocados, mais uma comunidade nova.
+    rotulos, proximo = match_labels(anterior, ['ana', 'bruno', 'carla', 'davi', 'eva', 'fabio'],
+                                    np.array([5, 5, 3, 3, 7, 7]), next_id=2)
+    assert rotulos.tolist() == [0, 0, 1, 1, 2, 2]
+    assert proximo == 3
+
+
+def test_janelas_sobrepostas_contam_interacoes_do_intervalo():
+    posts, comments = conversa()
+    eventos = interaction_events(posts, comments)
+    janelas = list(sliding_windows(posts, comments, width=2 * DAY, stride=DAY))
+
+    assert len(janelas) == 6
+    for janela in janelas:
+        inicio = pd.Timestamp(janela['start']).timestamp()
+        fim = pd.Timestamp(janela['end']).timestamp()
+        dentro = eventos[(eventos['created_utc'] >= inicio) & (eventos['created_utc'] < fim)]
+        assert janela['interactions'] == len(dentro)
+        esperado = InteractionGraph.from_edges(interaction_edges(zip(dentro['autor'], dentro['autor_pai'])))
+        assert (janela['authors'], janela['edges']) == (esperado.n_nodes, esperado.n_edges)
+        assert sum(janela['community_sizes'].values()) == janela['authors']
+    assert all('stability' in janela for janela in janelas[1:])
@@ -0,0 +1,33 @@
+import numpy as np
+from scipy import sparse
+from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score
+
+from qualidade import centroid_scores
+
+
+def dados():
+    rng = np.random.default_rng(0)
+    centros = np.array([[0, 0, 0], [5, 5, 0], [0, 5, 5]], dtype=float)
+    rotulos = np.repeat([0, 1, 2], 30)
+    return centros[rotulos] + rng.normal(size=(90, 3)), rotulos
+
+
+def test_indices_iguais_ao_sklearn_em_blocos():
+    X, rotulos = dados()
+    scores = centroid_scores(sparse.csr_matrix(X), rotulos, chunk_size=17)
+    assert np.isclose(scores['davies_bouldin'], davies_bouldin_score(X, rotulos))
+    assert np.isclose(scores['calinski_harabasz'], calinski_harabasz_score(X, rotulos))
+
+
+def test_centros_do_modelo_com_cluster_vazio():
+    X, rotulos = dados()
+    # Como no MiniBatchKMeans com um cluster vazio: rótulos 0, 2 e 3, e quatro centros.
+    rotulos = np.where(rotulos == 0, 0, rotulos + 1)
+    centros = np.zeros((4, 3))
+    for c in (0, 2, 3):
+        centros[c] = X[rotulos == c].mean(axis=0)
+    centros[1] = 100
+
+    scores = centroid_scores(X, rotulos, centers=centros)
+    assert np.isclose(scores['davies_bouldin'], davies_bouldin_score(X, rotulos))
+    assert np.isclose(scores['calinski_harabasz'], calinski_harabasz_score(X, rotulos))
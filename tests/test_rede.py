@@ -0,0 +1,83 @@
+import community
+import networkx as nx
+import numpy as np
+import pytest
+
+from rede import InteractionGraph, louvain, modularity, update_partition
+
+SEEDS = [0, 1, 2, 3]
+GROUPS, GROUP_SIZE = 5, 30
+
+
+def planted_graph(seed, weighted=False):
+    G = nx.planted_partition_graph(GROUPS, GROUP_SIZE, 0.3, 0.02, seed=seed)
+    if weighted:
+        rng = np.random.default_rng(seed)
+        for u, v in G.edges():
+            G[u][v]['weight'] = int(rng.integers(1, 5))
+    return G
+
+
+def adjacency(G):
+    return nx.to_scipy_sparse_array(G, nodelist=range(G.number_of_nodes()), format='csr')
+
+
+def q(G, labels):
+    return community.modularity(dict(enumerate(np.asarray(labels).tolist())), G)
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+@pytest.mark.parametrize('seed', SEEDS)
+def test_louvain_igual_ao_python_louvain(seed, weighted):
+    G = planted_graph(seed, weighted)
+    rotulos = louvain(adjacency(G), random_state=seed)
+
+    referencia = community.modularity(community.best_partition(G, random_state=seed), G)
+    assert q(G, rotulos) == pytest.approx(referencia, abs=0.005)
+    assert len(set(rotulos.tolist())) == GROUPS
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_modularidade_igual_ao_python_louvain(seed):
+    G = planted_graph(seed, weighted=True)
+    rotulos = np.random.default_rng(seed).integers(0, GROUPS, G.number_of_nodes())
+    assert modularity(adjacency(G), rotulos) == pytest.approx(q(G, rotulos))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_louvain_com_particao_inicial(seed):
+    G = planted_graph(seed)
+    plantada = np.arange(G.number_of_nodes()) // GROUP_SIZE
+    # Rótulos da partição inicial embaralhados: só o agrupamento importa.
+    inicial = np.random.default_rng(seed).permutation(GROUPS)[plantada] * 7
+
+    rotulos = louvain(adjacency(G), random_state=seed, partition=inicial)
+    assert q(G, rotulos) >= q(G, plantada) - 1e-9
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_update_partition_com_autores_novos(seed):
+    G = planted_graph(seed)
+    nomes = np.array([f"autor{n}" for n in G.nodes()], dtype=object)
+    grafo = InteractionGraph.from_edges([(nomes[u], nomes[v], 1) for u, v in G.edges()])
+    rotulos = louvain(grafo.adjacency(), random_state=seed)
+
+    # Um grupo novo de autores, muito ligado entre si e com uma única resposta para a rede antiga.
+    novos = [f"novo{i}" for i in range(GROUP_SIZE)]
+    arestas = [(a, b, 1) for i, a in enumerate(novos) for b in novos[i + 1:]]
+    arestas.append((novos[0], grafo.names[0], 1))
+
+    atualizado, novos_rotulos = update_partition(grafo, rotulos, arestas, random_state=seed)
+    assert atualizado.n_nodes == grafo.n_nodes + GROUP_SIZE
+    assert list(atualizado.names[:grafo.n_nodes]) == list(grafo.names)
+
+    # Os autores novos formam uma comunidade própria; a partição antiga é preservada.
+    assert len(set(novos_rotulos[grafo.n_nodes:].tolist())) == 1
+    assert novos_rotulos[grafo.n_nodes] not in set(novos_rotulos[:grafo.n_nodes].tolist())
+    antigos = novos_rotulos[:grafo.n_nodes]
+    assert len(set(zip(rotulos.tolist(), antigos.tolist()))) == len(set(rotulos.tolist()))
+
+    G_atualizado = atualizado.to_networkx()
+    referencia = community.modularity(community.best_partition(G_atualizado, random_state=seed), G_atualizado)
+    particao = dict(zip(atualizado.names.tolist(), novos_rotulos.tolist()))
+    assert community.modularity(particao, G_atualizado) == pytest.approx(referencia, abs=0.005)
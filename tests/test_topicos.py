@@ -0,0 +1,34 @@
+from corpus_autores import AuthorCorpus
+from topicos import community_keywords_from_corpus
+
+
+def test_sem_texto_suficiente_retorna_vazio():
+    corpus = AuthorCorpus()
+    corpus.add('ana', 'texto curto sobre o tcc')
+    corpus.add('bruno', 'outro texto curto')
+
+    termos_chave = community_keywords_from_corpus(corpus, {0: ['ana'], 1: ['bruno']})
+
+    assert termos_chave.empty
+    assert 0 not in termos_chave.index
+
+
+def test_comunidade_com_texto_suficiente():
+    corpus = AuthorCorpus()
+    corpus.add('ana', 'orientador tcc prazo ' * 10)
+    corpus.add('bruno', 'curto')
+
+    termos_chave = community_keywords_from_corpus(corpus, {0: ['ana'], 1: ['bruno']})
+
+    assert list(termos_chave.index) == [0]
+    assert 'tcc' in termos_chave.loc[0, 'keywords']
+
+
+def test_textos_brutos_apenas_com_keep_texts(tmp_path):
+    corpus = AuthorCorpus()
+    corpus.add('ana', 'texto do tcc')
+    assert not corpus.chunks
+
+    corpus = AuthorCorpus(path=str(tmp_path / 'corpus.db'), keep_texts=True)
+    corpus.add('ana', 'texto do tcc')
+    assert list(corpus.texts('ana')) == ['texto do tcc']
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfTransformer
+
+from vetorizacao import StreamingTfidf, TermSampler, streaming_kmeans
+
+TEMAS = ['orientador prazo banca defesa', 'estágio empresa vaga salário', 'matemática cálculo prova nota']
+
+
+def textos(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [f"{TEMAS[i % len(TEMAS)]} {' '.join(rng.choice(['semestre', 'dúvida', 'ajuda'], 2))}" for i in range(n)]
+
+
+def test_tfidf_em_blocos_igual_ao_de_uma_vez():
+    corpus = textos(90)
+    vectorizer = StreamingTfidf(n_features=2 ** 12)
+    for start in range(0, len(corpus), 25):
+        vectorizer.partial_fit(corpus[start:start + 25])
+
+    esperado = TfidfTransformer().fit_transform(vectorizer.counts(corpus))
+    assert vectorizer.n_documents == len(corpus)
+    assert abs(vectorizer.transform(corpus) - esperado).max() < 1e-12
+
+
+def test_amostrador_traduz_baldes_frequentes():
+    sampler = TermSampler(n_features=2 ** 12)
+    sampler.update(['tcc'] * 50 + ['banca'] * 20 + ['raro'])
+    assert sampler.term(sampler.bucket('tcc')) == 'tcc'
+    assert sampler.term(sampler.bucket('banca')) == 'banca'
+    assert sampler.frequencies()['tcc'] == 50
+
+
+def test_kmeans_com_primeiros_blocos_vazios_ou_pequenos():
+    corpus = textos(60)
+    vectorizer = StreamingTfidf(n_features=2 ** 12).partial_fit(corpus)
+    blocos = [[], corpus[:3], corpus[3:8], corpus[8:30], [], corpus[30:]]
+
+    selecao = streaming_kmeans(iter(blocos), vectorizer, k_values=range(2, 6))
+    assert 2 <= selecao.k <= 5
+    assert len(selecao.model.predict(vectorizer.transform(corpus))) == len(corpus)
+
+
+def test_kmeans_com_fluxo_pequeno_demais():
+    corpus = textos(4)
+    vectorizer = StreamingTfidf(n_features=2 ** 12).partial_fit(corpus)
+    with pytest.raises(ValueError, match='ao menos 10'):
+        streaming_kmeans(iter([[], corpus]), vectorizer)
@@ -1,144 +1,213 @@
-import praw
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans
+from artefatos import ArtifactCache
 from sklearn.feature_extraction.text import TfidfVectorizer
-import nltk 
-import re
+from coleta import iter_posts, load_posts
+from deduplicacao import deduplicate
+from instrumentacao import RunReport
+from limpeza import clean_series, load_stopwords
+from renderizacao import show, wait
+from selecao_k import select_k
+from vetorizacao import StreamingTfidf, streaming_kmeans, top_buckets
 from wordcloud import WordCloud
 
-try:
-    nltk.data.find('corpora/stopwords')
-except nltk.downloader.DownloadError:
-    nltk.download('stopwords')
-
-portuguese_stopwords = nltk.corpus.stopwords.words('portuguese')
-portuguese_stopwords.extend(['tcc', 'pra', 'tô', 'aqui', 'lá', 'pro', 'ser', 'ter', 'fazer', 'coisa', 'alguém', 'ainda', 'sobre', 'tudo', 'sei', 'só', 'post', 'trabalho', 'curso'])
-
-def clean_text(text):
-    if not isinstance(text, str):
-        return ""
-    text = text.lower() 
-    text = re.sub(r'http\S+', '', text) 
-    text = re.sub(r'[^a-zà-ú\s]', '', text) 
-    text = re.sub(r'\s+', ' ', text).strip() 
-    return text
-
-print("--- 1. Coleta de Dados e Construção da Base Estruturada ---")
-client_id = 'SEU_CLIENT_ID'
-client_secret = 'SEU_CLIENT_SECRET'
-user_agent = 'USER_AGENT'
-
-reddit = praw.Reddit(client_id=client_id, client_secret=client_secret, user_agent=user_agent)
-
-subreddit_name = "faculdadeBR"
-search_query = 'TCC'
-limit_posts = 150 
-
-subreddit = reddit.subreddit(subreddit_name)
-
-posts_data = []
-print(f"Coletando até {limit_posts} posts do subreddit '{subreddit_name}' com a query '{search_query}'...")
-for submission in subreddit.search(search_query, limit=limit_posts):
-    posts_data.append({
-        'id': submission.id,
-        'title': submission.title,
-        'selftext': submission.selftext
-    })
-
-if not posts_data:
-    print("Nenhum post encontrado. Verifique a query, subreddit ou credenciais da API.")
-    exit()
-
-df = pd.DataFrame(posts_data)
-print(f"{len(df)} posts coletados.")
-
-print("\n--- 2. Pré-processamento e Análise Exploratória de Texto ---")
-
-df['selftext_cleaned'] = df['selftext'].apply(clean_text)
-
-df = df[df['selftext_cleaned'].str.len() > 10].copy() 
-print(f"Número de posts restantes após limpeza: {len(df)}")
-
-print("\nGerando nuvem de palavras a partir de todos os posts...")
-all_text = " ".join(review for review in df.selftext_cleaned)
-wordcloud = WordCloud(stopwords=portuguese_stopwords,
-                      background_color="white",
-                      width=800,
-                      height=400,
-                      colormap='viridis').generate(all_text)
-
-plt.figure(figsize=(10, 5))
-plt.imshow(wordcloud, interpolation='bilinear')
-plt.axis("off")
-plt.title("Nuvem de Palavras Mais Comuns nos Posts sobre TCC")
-plt.tight_layout()
-plt.show()
-
-print("\n--- 3. Transformação de Texto em Vetores com TF-IDF ---")
-print("Este passo converte o texto limpo em uma representação numérica que a máquina pode entender.")
-
-vectorizer = TfidfVectorizer(
-    stop_words=portuguese_stopwords,
-    max_features=1000, 
-    ngram_range=(1, 2)  
-)
-
-tfidf_matrix = vectorizer.fit_transform(df['selftext_cleaned'])
-
-print("Dimensões da matriz TF-IDF:", tfidf_matrix.shape)
-print("(Linhas = número de posts, Colunas = número de palavras únicas/features)")
-
-print("\n--- 4. Mineração de Texto: Modelagem de Tópicos com K-Means ---")
-print("Agrupando os posts em clusters com base no conteúdo textual (vetores TF-IDF).")
-
-inertia_values = []
-possible_k_values = range(2, 11) 
-
-for k in possible_k_values:
-    kmeans_temp = KMeans(n_clusters=k, random_state=42, n_init='auto')
-    kmeans_temp.fit(tfidf_matrix)
-    inertia_values.append(kmeans_temp.inertia_)
-
-plt.figure(figsize=(10, 6))
-plt.plot(possible_k_values, inertia_values, marker='o', linestyle='--')
-plt.title('Método do Cotovelo para K-Means (em dados de texto)')
-plt.xlabel('Número de Clusters (k)')
-plt.ylabel('Inércia')
-plt.xticks(possible_k_values)
-plt.grid(True)
-plt.tight_layout()
-plt.show()
-
-chosen_k = 4 
-print(f"Escolhido k = {chosen_k} para a modelagem de tópicos.")
-
-kmeans = KMeans(n_clusters=chosen_k, random_state=42, n_init='auto')
-df['cluster'] = kmeans.fit_predict(tfidf_matrix)
-
-print("\nContagem de Posts por Cluster (Tópico):")
-print(df['cluster'].value_counts())
-
-print("\n--- 5. Análise dos Tópicos Encontrados ---")
-print("Analisando as palavras mais significativas de cada cluster para entender o tópico.")
-
-terms = vectorizer.get_feature_names_out()
-order_centroids = kmeans.cluster_centers_.argsort()[:, ::-1]
-
-for i in range(chosen_k):
-    print(f"\nTópico {i}:")
-    for ind in order_centroids[i, :10]:
-        print(f' {terms[ind]}')
-
-print("\nExemplo de posts de cada tópico:")
-for i in range(chosen_k):
-    print(f"\n--- Tópico {i} ---")
-    
-    num_exemplos = 3
-    sample_posts = df[df['cluster'] == i].sample(n=min(num_exemplos, len(df[df['cluster'] == i])), random_state=1)
-    
-    for index, row in sample_posts.iterrows():
-        print(f"Post ID: {row['id']}\nTítulo: {row['title']}\nTexto: {row['selftext'][:200]}...\\n")
-
-
-print("\n--- Fim da Análise de Mineração de Texto ---")
\ No newline at end of file
+# Modo em blocos: lê os posts já coletados do cache e vetoriza com hashing, em memória limitada.
+STREAMING = os.environ.get('TEXT_MINING_STREAMING') == '1'
+
+
+def blocos_limpos(subreddit_name, search_query):
+    for posts in iter_posts(subreddit_name, search_query):
+        bloco = pd.DataFrame(posts, columns=['id', 'title', 'selftext'])
+        bloco['selftext_cleaned'] = clean_series(bloco['selftext'])
+        yield bloco[bloco['selftext_cleaned'].str.len() > 10]
+
+
+def main(subreddit_name='faculdadeBR', search_query='TCC', limit_posts=150, streaming=STREAMING):
+    portuguese_stopwords = load_stopwords()
+    relatorio = RunReport('text_mining')
+    artefatos = ArtifactCache()
+
+    print("--- 1. Coleta de Dados e Construção da Base Estruturada ---")
+
+    etapa = relatorio.start('coleta')
+    if streaming:
+        print(f"Lendo em blocos os posts já coletados do subreddit '{subreddit_name}' com a query '{search_query}'...")
+    else:
+        print(f"Coletando até {limit_posts} posts do subreddit '{subreddit_name}' com a query '{search_query}'...")
+        posts_data = [{
+            'id': post['id'],
+            'title': post['title'],
+            'selftext': post['selftext']
+        } for post in load_posts(subreddit_name, search_query, limit_posts)]
+
+        if not posts_data:
+            print("Nenhum post encontrado. Verifique a query, subreddit ou credenciais da API.")
+            return
+
+        df = pd.DataFrame(posts_data)
+        print(f"{len(df)} posts coletados.")
+        etapa['rows'] = len(df)
+
+    etapa = relatorio.start('limpeza')
+    print("\n--- 2. Pré-processamento e Análise Exploratória de Texto ---")
+
+    if streaming:
+        # Primeira passada: limpeza, frequências de documento (IDF) e amostra de termos por balde do hash.
+        vectorizer = StreamingTfidf(stopwords=portuguese_stopwords)
+        for bloco in blocos_limpos(subreddit_name, search_query):
+            vectorizer.partial_fit(bloco['selftext_cleaned'])
+
+        if vectorizer.n_documents == 0:
+            print("Nenhum post no cache. Execute a coleta antes do modo em blocos.")
+            return
+        print(f"Número de posts restantes após limpeza: {vectorizer.n_documents}")
+        etapa['rows'] = vectorizer.n_documents
+    else:
+        df['selftext_cleaned'] = artefatos.clean(df['selftext'])
+
+        df = df[df['selftext_cleaned'].str.len() > 10].copy() 
+        print(f"Número de posts restantes após limpeza: {len(df)}")
+        etapa['rows'] = len(df)
+
+    relatorio.start('nuvem_de_palavras')
+    print("\nGerando nuvem de palavras a partir de todos os posts...")
+    wordcloud = WordCloud(stopwords=portuguese_stopwords,
+                          background_color="white",
+                          width=800,
+                          height=400,
+                          colormap='viridis')
+    if streaming:
+        wordcloud.generate_from_frequencies(vectorizer.sampler.frequencies())
+    else:
+        all_text = " ".join(review for review in df.selftext_cleaned)
+        wordcloud.generate(all_text)
+
+    plt.figure(figsize=(10, 5))
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.axis("off")
+    plt.title("Nuvem de Palavras Mais Comuns nos Posts sobre TCC")
+    plt.tight_layout()
+    show('text_mining_nuvem')
+
+    etapa = relatorio.start('vetorizacao')
+    print("\n--- 3. Transformação de Texto em Vetores com TF-IDF ---")
+    print("Este passo converte o texto limpo em uma representação numérica que a máquina pode entender.")
+
+    if streaming:
+        print("Dimensões da matriz TF-IDF:", (vectorizer.n_documents, len(vectorizer.idf)))
+        etapa['rows'], etapa['features'] = vectorizer.n_documents, len(vectorizer.idf)
+        print("(Linhas = número de posts, Colunas = baldes do hash de palavras/bigramas)")
+    else:
+        vectorizer = TfidfVectorizer(
+            stop_words=portuguese_stopwords,
+            max_features=1000, 
+            ngram_range=(1, 2)  
+        )
+
+        # Quase-duplicatas (reposts, textos copiados) entram uma vez só, com peso igual ao tamanho do grupo.
+        representantes, grupo, pesos = artefatos.cached('deduplicacao', lambda: deduplicate(df['selftext_cleaned']),
+                                                        df['selftext_cleaned'].to_numpy())
+        print(f"{len(df) - len(representantes)} posts quase duplicados agrupados; "
+              f"{len(representantes)} textos distintos seguem para a vetorização.")
+        etapa['duplicates'] = len(df) - len(representantes)
+
+        textos = df['selftext_cleaned'].iloc[representantes].to_numpy()
+        vectorizer, tfidf_matrix = artefatos.cached('tfidf', lambda: (vectorizer, vectorizer.fit_transform(textos)),
+                                                    textos, vectorizer.get_params())
+
+        print("Dimensões da matriz TF-IDF:", tfidf_matrix.shape)
+        etapa['rows'], etapa['features'] = tfidf_matrix.shape
+        print(f"(Linhas = {tfidf_matrix.shape[0]} textos distintos dos {len(df)} posts, "
+              f"Colunas = número de palavras únicas/features)")
+
+    etapa = relatorio.start('clustering')
+    print("\n--- 4. Mineração de Texto: Modelagem de Tópicos com K-Means ---")
+    print("Agrupando os posts em clusters com base no conteúdo textual (vetores TF-IDF).")
+
+    if streaming:
+        # Segunda passada: o k sai do primeiro bloco e o MiniBatchKMeans é atualizado com os demais.
+        blocos = (bloco['selftext_cleaned'] for bloco in blocos_limpos(subreddit_name, search_query))
+        selecao = streaming_kmeans(blocos, vectorizer)
+    else:
+        selecao = artefatos.cached('select_k', lambda: select_k(tfidf_matrix, range(2, 11), sample_weight=pesos),
+                                   tfidf_matrix, pesos, k_values=list(range(2, 11)))
+    inertia_values = selecao.inertia
+    possible_k_values = selecao.k_values
+
+    plt.figure(figsize=(10, 6))
+    plt.plot(possible_k_values, inertia_values, marker='o', linestyle='--')
+    plt.title('Método do Cotovelo para K-Means (em dados de texto)')
+    plt.xlabel('Número de Clusters (k)')
+    plt.ylabel('Inércia')
+    plt.xticks(possible_k_values)
+    plt.grid(True)
+    plt.tight_layout()
+    show('text_mining_cotovelo')
+
+    chosen_k = selecao.k
+    etapa['clusters'] = chosen_k
+    print(f"Escolhido k = {chosen_k} para a modelagem de tópicos (ponto de cotovelo).")
+
+    kmeans = selecao.model
+    if streaming:
+        # Terceira passada: rótulos finais e alguns exemplos por tópico, sem manter os textos.
+        contagem = pd.Series(0, index=range(chosen_k))
+        df = pd.DataFrame(columns=['id', 'title', 'selftext', 'selftext_cleaned', 'cluster'])
+        for bloco in blocos_limpos(subreddit_name, search_query):
+            bloco = bloco.assign(cluster=kmeans.predict(vectorizer.transform(bloco['selftext_cleaned'])))
+            contagem = contagem.add(bloco['cluster'].value_counts(), fill_value=0)
+            df = pd.concat([df, bloco]).groupby('cluster').head(3)
+
+        print("\nContagem de Posts por Cluster (Tópico):")
+        print(contagem.astype(int).rename('count').rename_axis('cluster').sort_values(ascending=False))
+        tamanhos = contagem.astype(int).to_dict()
+    else:
+        # Cada post herda o cluster do representante do seu grupo.
+        df['cluster'] = kmeans.labels_[grupo]
+
+        print("\nContagem de Posts por Cluster (Tópico):")
+        print(df['cluster'].value_counts())
+        tamanhos = df['cluster'].value_counts().sort_index().to_dict()
+
+    relatorio.start('topicos')
+    print("\n--- 5. Análise dos Tópicos Encontrados ---")
+    print("Analisando as palavras mais significativas de cada cluster para entender o tópico.")
+
+    if streaming:
+        order_centroids = top_buckets(kmeans.cluster_centers_)
+    else:
+        terms = vectorizer.get_feature_names_out()
+        order_centroids = kmeans.cluster_centers_.argsort()[:, ::-1]
+
+    termos_por_topico = {}
+    for i in range(chosen_k):
+        print(f"\nTópico {i}:")
+        termos_por_topico[i] = [vectorizer.sampler.term(ind) if streaming else terms[ind]
+                                for ind in order_centroids[i, :10]]
+        for termo in termos_por_topico[i]:
+            print(f' {termo}')
+
+    print("\nExemplo de posts de cada tópico:")
+    for i in range(chosen_k):
+        print(f"\n--- Tópico {i} ---")
+
+        num_exemplos = 3
+        sample_posts = df[df['cluster'] == i].sample(n=min(num_exemplos, len(df[df['cluster'] == i])), random_state=1)
+
+        for index, row in sample_posts.iterrows():
+            print(f"Post ID: {row['id']}\nTítulo: {row['title']}\nTexto: {row['selftext'][:200]}...\\n")
+
+
+    relatorio.start('renderizacao')
+    wait()
+    relatorio.finish()
+    if not streaming:
+        print(f"\nCache de artefatos: {artefatos.hits} etapas reaproveitadas, {artefatos.misses} recalculadas.")
+
+    print("\n--- Fim da Análise de Mineração de Texto ---")
+    return {'k': chosen_k, 'cluster_sizes': tamanhos, 'top_terms': termos_por_topico}
+
+
+if __name__ == '__main__':
+    main()
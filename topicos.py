@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+MIN_TEXT_LENGTH = 100
+TOP_N = 15
+
+
+def tfidf_scores(counts):
+    n_documents = counts.shape[0]
+    document_frequency = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+    return normalize(counts @ sparse.diags(idf), norm='l2')
+
+
+def ctfidf_scores(counts):
+    term_frequency = normalize(counts, norm='l1')
+    average_words = counts.sum() / counts.shape[0]
+    idf = np.log(1 + average_words / np.asarray(counts.sum(axis=0)).ravel())
+    return term_frequency @ sparse.diags(idf)
+
+
+def top_terms(scores, terms, top_n=TOP_N):
+    scores = sparse.csr_matrix(scores)
+    result = []
+    for row in range(scores.shape[0]):
+        start, end = scores.indptr[row], scores.indptr[row + 1]
+        data = scores.data[start:end]
+        indices = scores.indices[start:end]
+        if len(data) > top_n:
+            best = np.argpartition(-data, top_n)[:top_n]
+        else:
+            best = np.arange(len(data))
+        best = best[np.argsort(-data[best], kind='stable')]
+        result.append([terms[i] for i in indices[best]])
+    return result
+
+
+def empty_keywords():
+    return pd.DataFrame({'keywords': []}, index=pd.Index([], name='community'))
+
+
+def keywords_from_counts(counts, terms, communities, top_n=TOP_N, method='tfidf'):
+    counts = sparse.csr_matrix(counts, dtype=float)
+    if counts.shape[0] == 0:
+        return empty_keywords()
+    if method == 'tfidf':
+        scores = tfidf_scores(counts)
+    elif method == 'ctfidf':
+        scores = ctfidf_scores(counts)
+    else:
+        raise ValueError(f"Método desconhecido: {method!r}")
+
+    return pd.DataFrame({'keywords': top_terms(scores, np.asarray(terms), top_n)},
+                        index=pd.Index(communities, name='community'))
+
+
+def community_keywords_from_corpus(corpus, membership, top_n=TOP_N, method='tfidf', min_length=MIN_TEXT_LENGTH):
+    lengths = corpus.text_lengths()
+    eligible = {}
+    for community, members in membership.items():
+        member_lengths = [lengths[author] for author in members if lengths.get(author)]
+        if sum(member_lengths) + max(len(member_lengths) - 1, 0) >= min_length:
+            eligible[community] = members
+
+    if not eligible:
+        return empty_keywords()
+
+    counts, terms, communities = corpus.community_counts(eligible)
+    with_terms = np.flatnonzero(counts.getnnz(axis=1))
+    return keywords_from_counts(counts[with_terms], terms, [communities[row] for row in with_terms], top_n, method)
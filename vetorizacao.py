@@ -0,0 +1,119 @@
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+
+from selecao_k import select_k
+
+N_FEATURES = 2 ** 18
+MAX_TERMS = 3
+TOP_N = 10
+
+
+class TermSampler:
+    # Para cada balde do hash guarda poucos termos candidatos (contagem Misra-Gries),
+    # o suficiente para traduzir de volta os baldes mais pesados de cada tópico.
+    def __init__(self, n_features=N_FEATURES, max_terms=MAX_TERMS):
+        self.n_features = n_features
+        self.max_terms = max_terms
+        self.candidates = {}
+
+    def bucket(self, term):
+        return abs(murmurhash3_32(term, seed=0)) % self.n_features
+
+    def update(self, terms):
+        for term, count in Counter(terms).items():
+            candidates = self.candidates.setdefault(self.bucket(term), {})
+            if term in candidates or len(candidates) < self.max_terms:
+                candidates[term] = candidates.get(term, 0) + count
+                continue
+
+            smallest = min(min(candidates.values()), count)
+            for other in list(candidates):
+                candidates[other] -= smallest
+                if candidates[other] <= 0:
+                    del candidates[other]
+            if count > smallest:
+                candidates[term] = count - smallest
+
+    def term(self, bucket):
+        candidates = self.candidates.get(bucket)
+        if not candidates:
+            return f"<hash {bucket}>"
+        return max(candidates, key=candidates.get)
+
+    def frequencies(self):
+        return {self.term(bucket): max(candidates.values())
+                for bucket, candidates in self.candidates.items() if candidates}
+
+
+class StreamingTfidf:
+    def __init__(self, stopwords=None, ngram_range=(1, 2), n_features=N_FEATURES, sampler=None):
+        self.analyzer = HashingVectorizer(stop_words=stopwords, ngram_range=ngram_range).build_analyzer()
+        self.hasher = FeatureHasher(n_features=n_features, input_type='string', alternate_sign=False)
+        self.sampler = sampler if sampler is not None else TermSampler(n_features)
+        self.document_frequency = np.zeros(n_features, dtype=np.int64)
+        self.n_documents = 0
+
+    def counts(self, texts, update=False):
+        tokens = [self.analyzer(text) for text in texts]
+        if not tokens:
+            # O FeatureHasher não aceita um bloco vazio.
+            return sparse.csr_matrix((0, len(self.document_frequency)))
+        counts = self.hasher.transform(tokens)
+        if update:
+            for terms in tokens:
+                self.sampler.update(terms)
+            self.document_frequency += np.bincount(counts.indices, minlength=len(self.document_frequency))
+            self.n_documents += counts.shape[0]
+        return counts
+
+    @property
+    def idf(self):
+        # Mesma suavização do TfidfVectorizer, com as frequências vistas até agora.
+        return np.log((1 + self.n_documents) / (1 + self.document_frequency)) + 1
+
+    def weight(self, counts):
+        if counts.shape[0] == 0:
+            return sparse.csr_matrix(counts, dtype=float)
+        return normalize(counts @ sparse.diags(self.idf), norm='l2')
+
+    def partial_fit(self, texts):
+        self.counts(texts, update=True)
+        return self
+
+    def transform(self, texts):
+        return self.weight(self.counts(texts))
+
+
+def streaming_kmeans(chunks, vectorizer, k_values=range(2, 11), random_state=42):
+    # O k é escolhido nos primeiros blocos, juntados até terem ao menos max(k_values) linhas (blocos vazios ou
+    # pequenos no início não bastam para o K-Means); os demais só atualizam o MiniBatchKMeans.
+    k_max = max(k_values)
+    selecao, iniciais, n_rows = None, [], 0
+    for texts in chunks:
+        X = vectorizer.transform(texts)
+        if selecao is not None:
+            if X.shape[0]:
+                selecao.model.partial_fit(X)
+            continue
+
+        iniciais.append(X)
+        n_rows += X.shape[0]
+        if n_rows >= k_max:
+            selecao = select_k(sparse.vstack(iniciais).tocsr(), k_values, minibatch=True, random_state=random_state)
+            iniciais = None
+    if selecao is None:
+        raise ValueError(f"O fluxo tem {n_rows} textos; o K-Means precisa de ao menos {k_max}.")
+    return selecao
+
+
+def top_buckets(centers, top_n=TOP_N):
+    centers = np.asarray(centers)
+    best = np.argpartition(-centers, top_n, axis=1)[:, :top_n]
+    order = np.argsort(-np.take_along_axis(centers, best, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(best, order, axis=1)